@@ -0,0 +1,202 @@
+"""
+Audio Archive for Speech Transcriber
+Stores the captured PCM of a session in a compressed, chunked file that can
+be read back from any offset without decompressing what comes before it
+"""
+
+import audioop
+import bisect
+import json
+import queue
+import struct
+import threading
+import zlib
+
+import metrics
+
+
+MAGIC = b"TSAUDIO1"
+FOOTER_MAGIC = b"TSAINDEX"
+_LENGTH = struct.Struct("<I")
+_CHUNK = struct.Struct("<IQI")   # compressed bytes, first sample, sample count
+_FOOTER = struct.Struct("<Q8s")  # index offset, FOOTER_MAGIC
+
+# Layout of a .tsa file:
+#   MAGIC, header length, JSON header {sample_rate, sample_width, channels}
+#   chunks: _CHUNK header + zlib-compressed PCM, in sample order
+#   JSON index [[file offset, first sample, sample count], ...], _FOOTER
+# The index is only written on close; a file cut short by a crash is
+# recovered by walking the chunk headers instead.
+
+
+class AudioArchiveWriter:
+    """Appends captures to an archive from a background thread
+
+    ``append`` only assigns the capture its place in the archive and queues
+    it, so the listener never waits for compression or disk. The queue
+    holds at most ``max_pending`` captures; beyond that captures are
+    dropped (and counted) rather than letting memory grow.
+    """
+
+    def __init__(self, path, sample_rate, sample_width, chunk_seconds=2.0, max_pending=64, level=6):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.chunk_samples = int(sample_rate * chunk_seconds)
+        self.level = level
+
+        self.lock = threading.Lock()
+        self.next_sample = 0  # samples handed out so far, written or queued
+        self.dropped = 0
+        self.jobs = queue.Queue(maxsize=max_pending)
+
+        self.file = open(path, "wb")
+        header = json.dumps({"sample_rate": sample_rate, "sample_width": sample_width, "channels": 1}).encode()
+        self.file.write(MAGIC + _LENGTH.pack(len(header)) + header)
+        self.index = []
+        self.pending = bytearray()
+        self.pending_start = 0
+
+        self.thread = threading.Thread(target=self._run, name="audio-archive", daemon=True)
+        self.thread.start()
+
+    def append(self, audio):
+        """Queue one capture; returns its (offset, duration) in seconds, or None if dropped"""
+        pcm = audio.frame_data
+        if audio.sample_width != self.sample_width:
+            pcm = audioop.lin2lin(pcm, audio.sample_width, self.sample_width)
+        if audio.sample_rate != self.sample_rate:
+            pcm, _ = audioop.ratecv(pcm, self.sample_width, 1, audio.sample_rate, self.sample_rate, None)
+        samples = len(pcm) // self.sample_width
+
+        with self.lock:
+            try:
+                self.jobs.put_nowait(pcm)
+            except queue.Full:
+                self.dropped += 1
+                metrics.ARCHIVE_DROPS.inc()
+                return None
+            start = self.next_sample
+            self.next_sample += samples
+        return start / self.sample_rate, samples / self.sample_rate
+
+    def close(self):
+        """Write what is queued, then the index; blocks until done"""
+        self.jobs.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            pcm = self.jobs.get()
+            if pcm is None:
+                break
+            try:
+                self.pending.extend(pcm)
+                while len(self.pending) >= self.chunk_samples * self.sample_width:
+                    self._write_chunk(self.chunk_samples * self.sample_width)
+            except OSError as e:
+                print(f"Error writing audio archive: {e}")
+        try:
+            if self.pending:
+                self._write_chunk(len(self.pending))
+            index_offset = self.file.tell()
+            self.file.write(json.dumps(self.index).encode())
+            self.file.write(_FOOTER.pack(index_offset, FOOTER_MAGIC))
+        except OSError as e:
+            print(f"Error finishing audio archive: {e}")
+        finally:
+            self.file.close()
+
+    def _write_chunk(self, size):
+        data = bytes(self.pending[:size])
+        del self.pending[:size]
+        samples = len(data) // self.sample_width
+        compressed = zlib.compress(data, self.level)
+        offset = self.file.tell()
+        self.file.write(_CHUNK.pack(len(compressed), self.pending_start, samples) + compressed)
+        self.file.flush()
+        self.index.append((offset, self.pending_start, samples))
+        self.pending_start += samples
+        metrics.ARCHIVE_BYTES.inc(_CHUNK.size + len(compressed))
+
+
+class AudioArchiveReader:
+    """Random access to an archive: only the chunks covering a request are decompressed"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an audio archive")
+            (header_length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+            header = json.loads(f.read(header_length))
+            self.data_start = f.tell()
+            self.index = self._read_index(f)
+        self.sample_rate = header["sample_rate"]
+        self.sample_width = header["sample_width"]
+        self.starts = [start for _, start, _ in self.index]
+
+    def _read_index(self, f):
+        f.seek(0, 2)
+        size = f.tell()
+        if size - self.data_start >= _FOOTER.size:
+            f.seek(size - _FOOTER.size)
+            index_offset, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+            if magic == FOOTER_MAGIC:
+                f.seek(index_offset)
+                return [tuple(entry) for entry in json.loads(f.read(size - _FOOTER.size - index_offset))]
+
+        # No index (the session did not close cleanly): walk the chunk headers
+        index = []
+        offset = self.data_start
+        while offset + _CHUNK.size <= size:
+            f.seek(offset)
+            compressed, start, samples = _CHUNK.unpack(f.read(_CHUNK.size))
+            if offset + _CHUNK.size + compressed > size:
+                break  # partly written last chunk
+            index.append((offset, start, samples))
+            offset += _CHUNK.size + compressed
+        return index
+
+    @property
+    def duration(self):
+        if not self.index:
+            return 0.0
+        _, start, samples = self.index[-1]
+        return (start + samples) / self.sample_rate
+
+    def read(self, offset_seconds, duration_seconds):
+        """Raw PCM for the given span"""
+        first = max(int(offset_seconds * self.sample_rate), 0)
+        last = first + int(duration_seconds * self.sample_rate)
+        position = max(bisect.bisect_right(self.starts, first) - 1, 0)
+
+        pieces = []
+        with open(self.path, "rb") as f:
+            for offset, start, samples in self.index[position:]:
+                if start >= last:
+                    break
+                f.seek(offset)
+                compressed, _, _ = _CHUNK.unpack(f.read(_CHUNK.size))
+                pcm = zlib.decompress(f.read(compressed))
+                begin = max(first - start, 0) * self.sample_width
+                end = (min(last, start + samples) - start) * self.sample_width
+                pieces.append(pcm[begin:end])
+        return b"".join(pieces)
+
+
+def play_pcm(pcm, sample_rate, sample_width):
+    """Play raw mono PCM on the default output device (blocks until done)"""
+    import pyaudio
+
+    audio = pyaudio.PyAudio()
+    try:
+        stream = audio.open(format=audio.get_format_from_width(sample_width), channels=1,
+                            rate=sample_rate, output=True)
+        try:
+            stream.write(pcm)
+        finally:
+            stream.stop_stream()
+            stream.close()
+    finally:
+        audio.terminate()
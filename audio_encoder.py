@@ -0,0 +1,453 @@
+"""
+Audio Encoder Stage for Speech Transcriber
+Long-lived, in-process FLAC encoding that runs off the recognition thread
+"""
+
+import audioop
+import collections
+import hashlib
+import math
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+import speech_recognition as sr
+
+import metrics
+
+
+# FLAC frame checksums (CRC-8 poly 0x07, CRC-16 poly 0x8005)
+def _build_crc_table(poly, width):
+    top_bit = 1 << (width - 1)
+    mask = (1 << width) - 1
+    table = []
+    for byte in range(256):
+        crc = byte << (width - 8)
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) if crc & top_bit else (crc << 1)
+        table.append(crc & mask)
+    return table
+
+
+_CRC8_TABLE = _build_crc_table(0x07, 8)
+_CRC16_TABLE = _build_crc_table(0x8005, 16)
+
+_FLAC_CACHE_HITS = metrics.CACHE_LOOKUPS.labels(cache="flac", result="hit")
+_FLAC_CACHE_MISSES = metrics.CACHE_LOOKUPS.labels(cache="flac", result="miss")
+_PREPARE_CPU = metrics.ENCODER_CPU.labels(work="prepare")
+_PHRASE_CPU = metrics.ENCODER_CPU.labels(work="phrase")
+
+
+def _crc8(data):
+    crc = 0
+    for byte in data:
+        crc = _CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+def _crc16(data):
+    crc = 0
+    table = _CRC16_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+    return crc
+
+
+def _utf8_frame_number(number):
+    """Encode a frame number with FLAC's UTF-8-like variable length coding"""
+    if number < 0x80:
+        return bytes([number])
+    payload = []
+    while True:
+        payload.insert(0, 0x80 | (number & 0x3F))
+        number >>= 6
+        # Leading byte holds the marker bits plus the remaining high bits
+        marker_bits = len(payload) + 1
+        if number < (1 << (7 - marker_bits)):
+            lead = (0xFF << (8 - marker_bits)) & 0xFF
+            return bytes([lead | number] + payload)
+
+
+def encode_subframe(block):
+    """The FLAC subframe of one block of 16-bit little-endian mono PCM
+
+    The best FIXED predictor (order 0-4, by total absolute residual) with
+    Rice-coded residuals split into up to 16 partitions, each with its own
+    Rice parameter; a verbatim subframe if that would be smaller. Padded to
+    a whole byte, which for a mono frame is where the frame's padding goes.
+    """
+    samples = list(struct.unpack(f"<{len(block) // 2}h", block))
+    count = len(samples)
+    verbatim = b"\x02" + audioop.byteswap(block, 2)
+    if count < 2:
+        return verbatim
+
+    # residuals[order][i] is the prediction error of samples[i + order]
+    residuals = [samples]
+    for _ in range(min(4, count - 1)):
+        previous = residuals[-1]
+        residuals.append([b - a for a, b in zip(previous, previous[1:])])
+    order = min(range(len(residuals)), key=lambda o: sum(map(abs, residuals[o])))
+    unsigned = [r << 1 if r >= 0 else (-r << 1) - 1 for r in residuals[order]]
+
+    partition_order, partitions = _rice_partitions(unsigned, count, order)
+    bits = [format((0b001000 | order) << 1, "08b")]
+    bits += [format(sample & 0xFFFF, "016b") for sample in samples[:order]]
+    bits.append("00" + format(partition_order, "04b"))
+    for part, parameter in partitions:
+        bits.append(format(parameter, "04b"))
+        mask, top = (1 << parameter) - 1, 1 << parameter
+        bits += ["0" * (u >> parameter) + format((u & mask) | top, "b") for u in part]
+    bitstring = "".join(bits)
+    bitstring += "0" * (-len(bitstring) % 8)
+    if len(bitstring) // 8 >= len(verbatim):
+        return verbatim
+    return int(bitstring, 2).to_bytes(len(bitstring) // 8, "big")
+
+
+def _rice_cost(total, count):
+    """(estimated bits, parameter) of the cheapest Rice parameter for ``count`` values summing to ``total``"""
+    if count == 0:
+        return 4, 0
+    guess = max((total // count).bit_length() - 1, 0)
+    return min((count * (k + 1) + (total >> k) + 4, k) for k in range(max(guess - 1, 0), min(guess + 2, 15)))
+
+
+def _rice_partitions(unsigned, block_size, order, max_partition_order=4):
+    """Partition order and [(values, Rice parameter)] with the fewest estimated bits"""
+    best = None
+    for partition_order in range(max_partition_order + 1):
+        size = block_size >> partition_order
+        if block_size % (1 << partition_order) or size <= order:
+            break
+        # The first partition is short by the predictor's warm-up samples
+        bounds = [0] + [size * index - order for index in range(1, 1 << partition_order)] + [len(unsigned)]
+        parts = [unsigned[start:end] for start, end in zip(bounds, bounds[1:])]
+        costs = [_rice_cost(sum(part), len(part)) for part in parts]
+        bits = sum(cost for cost, _ in costs)
+        if best is None or bits < best[0]:
+            best = bits, partition_order, [(part, k) for part, (_, k) in zip(parts, costs)]
+    return best[1], best[2]
+
+
+class FlacStreamEncoder:
+    """Incremental FLAC encoder for 16-bit mono PCM
+
+    Each block becomes one frame holding ``encode_subframe``'s subframe.
+    Frames use FLAC's variable-blocksize framing, numbered by their first
+    sample, so blocks can be the chunks the microphone was read in. A
+    subframe does not depend on where its block sits in the stream, so it
+    can be encoded while the utterance is still being captured and passed
+    to ``write_block``; ``finish`` then only adds headers and checksums.
+    """
+
+    BLOCK_SIZE = 4096  # samples per frame for PCM fed through ``write``
+
+    def __init__(self, sample_rate, sample_width=2):
+        if sample_width != 2:
+            raise ValueError("FlacStreamEncoder only supports 16-bit audio")
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.block_bytes = self.BLOCK_SIZE * sample_width
+
+        self.pending = b""
+        self.frames = []
+        self.block_sizes = []
+        self.total_samples = 0
+        self.min_frame_size = None
+        self.max_frame_size = 0
+        self.md5 = hashlib.md5()
+        self.finished = None
+
+    def write(self, pcm):
+        """Feed little-endian PCM; returns the number of frames emitted"""
+        if self.finished is not None:
+            raise RuntimeError("Encoder has already been finished")
+        data = self.pending + pcm if self.pending else pcm
+        offset = 0
+        while len(data) - offset >= self.block_bytes:
+            self._encode_block(data[offset:offset + self.block_bytes])
+            offset += self.block_bytes
+        self.pending = data[offset:]
+        return offset // self.block_bytes
+
+    def write_block(self, block, subframe=None):
+        """Emit ``block`` as one frame, using its already encoded ``subframe`` if given"""
+        if self.finished is not None:
+            raise RuntimeError("Encoder has already been finished")
+        if self.pending:
+            self._encode_block(self.pending)
+            self.pending = b""
+        self._encode_block(block, subframe)
+
+    def finish(self):
+        """Flush the remaining samples and return the complete FLAC stream"""
+        if self.finished is not None:
+            return self.finished
+        if self.pending:
+            self._encode_block(self.pending)
+            self.pending = b""
+        self.finished = b"fLaC" + self._streaminfo() + b"".join(self.frames)
+        self.frames = []
+        return self.finished
+
+    def _encode_block(self, block, subframe=None):
+        samples = len(block) // self.sample_width
+        self.md5.update(block)
+
+        header = bytearray(b"\xff\xf9")  # sync code, variable-blocksize stream
+        header.append(0x70)  # 16-bit (blocksize - 1) follows, rate from STREAMINFO
+        header.append(0x08)  # mono, 16 bits per sample
+        header += _utf8_frame_number(self.total_samples)
+        header += struct.pack(">H", samples - 1)
+        header.append(_crc8(header))
+
+        frame = bytes(header) + (subframe if subframe is not None else encode_subframe(block))
+        frame += struct.pack(">H", _crc16(frame))
+
+        self.frames.append(frame)
+        self.block_sizes.append(samples)
+        self.total_samples += samples
+        size = len(frame)
+        self.min_frame_size = size if self.min_frame_size is None else min(self.min_frame_size, size)
+        self.max_frame_size = max(self.max_frame_size, size)
+
+    def _streaminfo(self):
+        bits_per_sample = self.sample_width * 8
+        packed = (
+            (self.sample_rate << 44)
+            | (0 << 41)  # channels - 1
+            | ((bits_per_sample - 1) << 36)
+            | self.total_samples
+        )
+        # The last block may be shorter than the minimum; 16 is FLAC's smallest
+        sizes = self.block_sizes[:-1] or self.block_sizes or [self.BLOCK_SIZE]
+        min_block = max(min(sizes), 16)
+        max_block = max(max(self.block_sizes or sizes), min_block)
+        body = struct.pack(">HH", min_block, max_block)
+        body += (self.min_frame_size or 0).to_bytes(3, "big")
+        body += self.max_frame_size.to_bytes(3, "big")
+        body += packed.to_bytes(8, "big")
+        body += self.md5.digest()
+        # Last-metadata-block flag set, block type 0 (STREAMINFO), length 34
+        return bytes([0x80]) + len(body).to_bytes(3, "big") + body
+
+
+class EncodedAudioData(sr.AudioData):
+    """AudioData that carries FLAC bytes encoded ahead of recognition"""
+
+    def __init__(self, frame_data, sample_rate, sample_width, flac_data):
+        super().__init__(frame_data, sample_rate, sample_width)
+        self.flac_data = flac_data
+
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        rate_matches = convert_rate is None or convert_rate == self.sample_rate
+        width_matches = convert_width is None or convert_width == self.sample_width
+        if self.flac_data is not None and rate_matches and width_matches:
+            _FLAC_CACHE_HITS.inc()
+            return self.flac_data
+        # Unusual conversion requested, let speech_recognition handle it
+        _FLAC_CACHE_MISSES.inc()
+        return super().get_flac_data(convert_rate, convert_width)
+
+
+class EncodingTap:
+    """Stream wrapper handing a phrase's chunks to the encoder stage as they are captured
+
+    Speech is found the way ``Recognizer.listen`` finds it (RMS above the
+    recognizer's energy threshold). Until then, the quiet chunks ``listen``
+    would put in front of the phrase (``non_speaking_duration``) are only
+    held, so silence between phrases is never encoded. After more than
+    ``pause_threshold`` of quiet the phrase is over and holding starts again.
+    """
+
+    def __init__(self, stream, encoder, source, recognizer):
+        self.stream = stream
+        self.encoder = encoder
+        self.sample_width = source.SAMPLE_WIDTH
+        self.recognizer = recognizer
+
+        seconds_per_buffer = float(source.CHUNK) / source.SAMPLE_RATE
+        self.pause_count = int(math.ceil(recognizer.pause_threshold / seconds_per_buffer))
+        self.leading = collections.deque(
+            maxlen=int(math.ceil(recognizer.non_speaking_duration / seconds_per_buffer)))
+        self.speaking = False
+        self.quiet = 0
+
+    def read(self, size):
+        buffer = self.stream.read(size)
+        if not buffer:
+            return buffer
+        if audioop.rms(buffer, self.sample_width) > self.recognizer.energy_threshold:
+            if not self.speaking:
+                self.speaking = True
+                for chunk in self.leading:
+                    self.encoder.prepare(chunk)
+                self.leading.clear()
+            self.quiet = 0
+        elif self.speaking:
+            self.quiet += 1
+            if self.quiet > self.pause_count:
+                self.speaking = False
+        if self.speaking:
+            self.encoder.prepare(buffer)
+        else:
+            self.leading.append(buffer)
+        return buffer
+
+    def close(self):
+        self.stream.close()
+
+
+class EncoderStage:
+    """Dedicated encoding thread placed between capture and recognition
+
+    Speech chunks read through an ``EncodingTap`` are encoded into
+    subframes while the utterance is still being captured (``prepare``);
+    the last ``max_prepared`` are kept by content. When the phrase is handed
+    over with ``submit``, its chunks are looked up and only the frame
+    headers and checksums remain to be done; audio that did not come
+    through a tap (merged or windowed captures) is encoded in full.
+    Submitted phrases always go before chunks still waiting to be prepared,
+    so preparing never delays a handover. The capture thread goes straight
+    back to listening, and the recognition side waits on the returned
+    future, which is usually already resolved by the time it runs.
+    """
+
+    def __init__(self, name="flac-encoder", max_prepared=1024):
+        self.condition = threading.Condition()
+        self.jobs = collections.deque()  # submitted phrases, encoded first
+        self.chunks = collections.deque(maxlen=max_prepared)  # captured chunks waiting to be prepared
+        self.prepared = collections.OrderedDict()  # chunk PCM -> subframe, encoder thread only
+        self.chunk_lengths = set()
+        self.max_prepared = max_prepared
+        self.stats_lock = threading.Lock()
+        self.phrases_encoded = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.chunks_prepared = 0
+        self.prepare_cpu_seconds = 0.0
+
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, audio, traces=()):
+        """Queue ``audio`` for encoding and return a Future of EncodedAudioData"""
+        future = Future()
+        with self.condition:
+            self.jobs.append((audio, traces, future))
+            self.condition.notify()
+        return future
+
+    def prepare(self, pcm):
+        """Queue one captured chunk of 16-bit PCM for encoding ahead of its phrase"""
+        with self.condition:
+            self.chunks.append(pcm)
+            self.condition.notify()
+
+    def qsize(self):
+        """Phrases waiting to be encoded"""
+        with self.condition:
+            return len(self.jobs)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.jobs and not self.chunks:
+                    self.condition.wait()
+                if not self.jobs:
+                    pcm = self.chunks.popleft()
+                else:
+                    pcm = None
+                    audio, traces, future = self.jobs.popleft()
+            if pcm is not None:
+                self._prepare(pcm)
+                continue
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                encoded = self._encode(audio)
+                for trace in traces:
+                    trace.mark("encode")
+                future.set_result(encoded)
+            except Exception as e:
+                future.set_exception(e)
+
+    def _prepare(self, pcm):
+        cpu_start = time.thread_time()
+        if pcm in self.prepared:
+            self.prepared.move_to_end(pcm)
+            return
+        self.prepared[pcm] = encode_subframe(pcm)
+        self.chunk_lengths.add(len(pcm))
+        while len(self.prepared) > self.max_prepared:
+            self.prepared.popitem(last=False)
+        cpu_seconds = time.thread_time() - cpu_start
+        _PREPARE_CPU.inc(cpu_seconds)
+        with self.stats_lock:
+            self.chunks_prepared += 1
+            self.prepare_cpu_seconds += cpu_seconds
+
+    def _encode(self, audio):
+        if isinstance(audio, EncodedAudioData):
+            return audio
+        if audio.sample_width != 2:
+            # Let the stock converter deal with other sample widths
+            return EncodedAudioData(audio.frame_data, audio.sample_rate, audio.sample_width, None)
+
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        encoder = FlacStreamEncoder(audio.sample_rate, audio.sample_width)
+        data = audio.frame_data
+        offset = 0
+        while offset < len(data):
+            # Captured chunks were encoded as they were read
+            for length in self.chunk_lengths:
+                block = data[offset:offset + length]
+                subframe = self.prepared.get(block)
+                if subframe is not None:
+                    encoder.write_block(block, subframe)
+                    offset += len(block)
+                    break
+            else:
+                break
+        encoder.write(data[offset:])
+        flac_data = encoder.finish()
+        self._record(len(audio.frame_data), len(flac_data),
+                     time.thread_time() - cpu_start, time.perf_counter() - wall_start)
+        return EncodedAudioData(audio.frame_data, audio.sample_rate, audio.sample_width, flac_data)
+
+    def _record(self, bytes_in, bytes_out, cpu_seconds, wall_seconds):
+        _PHRASE_CPU.inc(cpu_seconds)
+        with self.stats_lock:
+            self.phrases_encoded += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cpu_seconds += cpu_seconds
+            self.wall_seconds += wall_seconds
+
+    def stats(self):
+        """Return a snapshot of the encoder's own CPU and throughput metrics"""
+        with self.stats_lock:
+            phrases = self.phrases_encoded
+            return {
+                "phrases_encoded": phrases,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "cpu_seconds": self.cpu_seconds,
+                "avg_encode_ms": (self.wall_seconds / phrases * 1000) if phrases else 0.0,
+                "chunks_prepared": self.chunks_prepared,
+                "prepare_cpu_seconds": self.prepare_cpu_seconds,
+            }
+
+    def stats_summary(self):
+        """One-line summary suitable for the console or a status label"""
+        stats = self.stats()
+        return (f"Encoder: {stats['phrases_encoded']} phrases, "
+                f"{stats['cpu_seconds'] * 1000:.0f} ms CPU, "
+                f"{stats['avg_encode_ms']:.1f} ms avg; "
+                f"{stats['chunks_prepared']} speech chunks prepared while capturing, "
+                f"{stats['prepare_cpu_seconds'] * 1000:.0f} ms CPU")
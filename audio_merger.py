@@ -0,0 +1,81 @@
+"""
+Audio Merging for Speech Transcriber
+Concatenates buffered phrases into fewer, larger recognition requests
+"""
+
+import threading
+
+import speech_recognition as sr
+
+
+class AudioMerger:
+    """Groups buffered captures and joins each group into one AudioData
+
+    Consecutive captures are merged while they share a sample format, the
+    silence between them is at most ``max_gap_seconds`` and the merged audio
+    stays under ``max_total_seconds``. A short pad of silence is inserted
+    between phrases so words at the seams are not glued together.
+    """
+
+    def __init__(self, max_total_seconds=15.0, max_gap_seconds=3.0, padding_seconds=0.3):
+        self.max_total_seconds = max_total_seconds
+        self.max_gap_seconds = max_gap_seconds
+        self.padding_seconds = padding_seconds
+
+        self.stats_lock = threading.Lock()
+        self.chunks_in = 0
+        self.requests_out = 0
+
+    @staticmethod
+    def duration(audio):
+        return len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+
+    def plan(self, captures):
+        """Split ``(end_time, audio, ...)`` captures into groups to merge"""
+        groups = []
+        current = []
+        current_duration = 0.0
+        for capture in captures:
+            end_time, audio = capture[0], capture[1]
+            if current:
+                last_end, last_audio = current[-1][0], current[-1][1]
+                gap = (end_time - self.duration(audio)) - last_end
+                same_format = (audio.sample_rate == last_audio.sample_rate
+                               and audio.sample_width == last_audio.sample_width)
+                fits = current_duration + self.padding_seconds + self.duration(audio) <= self.max_total_seconds
+                if same_format and fits and gap <= self.max_gap_seconds:
+                    current.append(capture)
+                    current_duration += self.padding_seconds + self.duration(audio)
+                    continue
+                groups.append(current)
+            current = [capture]
+            current_duration = self.duration(audio)
+        if current:
+            groups.append(current)
+        return groups
+
+    def merge(self, group):
+        """Concatenate one planned group with silence padding in between"""
+        first = group[0][1]
+        if len(group) == 1:
+            return first
+
+        # Unsigned 8-bit audio is centred on 0x80, wider formats on zero
+        silence_sample = b"\x80" if first.sample_width == 1 else b"\x00" * first.sample_width
+        padding = silence_sample * int(self.padding_seconds * first.sample_rate)
+
+        frame_data = padding.join(capture[1].frame_data for capture in group)
+        return sr.AudioData(frame_data, first.sample_rate, first.sample_width)
+
+    def merge_groups(self, captures):
+        """Return ``(merged_audio, group)`` for every request to send"""
+        merged = [(self.merge(group), group) for group in self.plan(captures)]
+        with self.stats_lock:
+            self.chunks_in += len(captures)
+            self.requests_out += len(merged)
+        return merged
+
+    def stats_summary(self):
+        with self.stats_lock:
+            saved = self.chunks_in - self.requests_out
+            return f"Merger: {self.chunks_in} chunks sent as {self.requests_out} requests ({saved} saved)"
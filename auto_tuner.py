@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Auto Tuner for Speech Transcriber
+Replays a labelled corpus through the listener and recognizer, searches the
+profile settings for the lowest latency at a target accuracy and writes
+the best one to profiles/tuned.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from datetime import datetime
+
+import speech_recognition as sr
+
+from transcriber_engine import PROFILES, PROFILES_DIR, RECOGNIZER_SETTINGS
+
+# Search space: (low, high) for floats, a list for choices
+SEARCH_SPACE = {
+    "pause_threshold": (0.3, 2.0),
+    "phrase_threshold": (0.03, 0.3),
+    "non_speaking_duration": (0.2, 1.0),
+    "phrase_time_limit": [None, 6, 8, 10],
+}
+
+def load_corpus(corpus_dir):
+    """Pairs of ``<name>.wav`` (or .flac/.aiff) and ``<name>.txt`` reference transcripts"""
+    clips = []
+    for filename in sorted(os.listdir(corpus_dir)):
+        stem, extension = os.path.splitext(filename)
+        transcript = os.path.join(corpus_dir, stem + ".txt")
+        if extension.lower() in (".wav", ".flac", ".aiff", ".aif") and os.path.exists(transcript):
+            with open(transcript, 'r', encoding='utf-8') as f:
+                clips.append((os.path.join(corpus_dir, filename), f.read().strip()))
+    return clips
+
+
+def _words(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level edit distance divided by the reference length"""
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+class _EndTap:
+    """Stream wrapper that notices when an audio file has been read to the end"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.ended = False
+
+    def read(self, size):
+        buffer = self.stream.read(size)
+        if not buffer:
+            self.ended = True
+        return buffer
+
+    def close(self):
+        self.stream.close()
+
+
+class CorpusReplay:
+    """Runs one set of settings over the corpus, caching recognition results
+
+    Identical segments come out of many candidate settings, so each distinct
+    segment is recognized once; its text and measured recognition time are
+    kept in a JSON cache next to the corpus for later runs.
+    """
+
+    def __init__(self, clips, cache_path, calibration_seconds=0.5, hop_seconds=4.0):
+        self.clips = clips
+        self.hop_seconds = hop_seconds  # phrase_time_limit used by windowed profiles when it is null
+        self.cache_path = cache_path
+        self.calibration_seconds = calibration_seconds
+        self.cache = {}
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+
+    def save_cache(self):
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f)
+
+    def recognize(self, recognizer, audio):
+        key = hashlib.sha1(audio.frame_data).hexdigest()
+        if key not in self.cache:
+            started = time.perf_counter()
+            try:
+                text = recognizer.recognize_google(audio)
+            except sr.UnknownValueError:
+                text = ""
+            self.cache[key] = {"text": text, "seconds": time.perf_counter() - started}
+        entry = self.cache[key]
+        return entry["text"], entry["seconds"]
+
+    def segment(self, recognizer, path, phrase_time_limit):
+        """Cut one clip into phrases the way the live listener would"""
+        # Calibrate on the clip's lead-in, then replay it from the start
+        with sr.AudioFile(path) as source:
+            recognizer.adjust_for_ambient_noise(source, duration=self.calibration_seconds)
+
+        segments = []
+        with sr.AudioFile(path) as source:
+            source.stream = _EndTap(source.stream)
+            while not source.stream.ended:
+                audio = recognizer.listen(source, phrase_time_limit=phrase_time_limit)
+                duration = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+                if duration > recognizer.non_speaking_duration * 2:
+                    cut = phrase_time_limit is not None and duration >= phrase_time_limit
+                    segments.append((audio, cut))
+        return segments
+
+    def evaluate(self, settings):
+        """Return (accuracy, mean latency seconds) of ``settings`` over the corpus"""
+        recognizer = sr.Recognizer()
+        recognizer.dynamic_energy_threshold = False  # keep replays deterministic
+        for setting in RECOGNIZER_SETTINGS:
+            if setting != "dynamic_energy_threshold":
+                setattr(recognizer, setting, settings[setting])
+        phrase_time_limit = settings["phrase_time_limit"] or self.hop_seconds
+
+        errors, latencies = [], []
+        for path, reference in self.clips:
+            texts = []
+            for audio, cut in self.segment(recognizer, path, phrase_time_limit):
+                text, seconds = self.recognize(recognizer, audio)
+                texts.append(text)
+                # A phrase ended by a pause is only sent pause_threshold after the last word
+                latencies.append(seconds + (0.0 if cut else settings["pause_threshold"]))
+            errors.append(word_error_rate(reference, " ".join(texts)))
+
+        accuracy = 1.0 - sum(errors) / len(errors)
+        latency = sum(latencies) / len(latencies) if latencies else float("inf")
+        return accuracy, latency
+
+
+def candidates(base, trials, rng):
+    """The base profile first, then random points of the search space"""
+    yield {key: base[key] for key in SEARCH_SPACE}
+    for _ in range(trials):
+        candidate = {}
+        for key, space in SEARCH_SPACE.items():
+            candidate[key] = rng.choice(space) if isinstance(space, list) else round(rng.uniform(*space), 2)
+        # speech_recognition requires pause_threshold >= non_speaking_duration
+        candidate["non_speaking_duration"] = min(candidate["non_speaking_duration"], candidate["pause_threshold"])
+        yield candidate
+
+
+def tune(corpus_dir, base_name="fast", target_accuracy=0.9, trials=30, seed=0):
+    clips = load_corpus(corpus_dir)
+    if not clips:
+        raise SystemExit(f"No <name>.wav + <name>.txt pairs found in {corpus_dir}")
+
+    base = PROFILES[base_name]
+    replay = CorpusReplay(clips, os.path.join(corpus_dir, ".tuner_cache.json"),
+                          hop_seconds=base["window_seconds"] - base["overlap_seconds"])
+    rng = random.Random(seed)
+
+    print(f"=== Auto Tuner: {len(clips)} clips, base profile '{base_name}', "
+          f"target accuracy {target_accuracy:.0%} ===")
+    print()
+    print(f"{'#':>3} {'pause':>6} {'phrase':>7} {'nonspk':>7} {'limit':>6} {'accuracy':>9} {'latency':>9}")
+
+    results = []
+    try:
+        for index, candidate in enumerate(candidates(base, trials, rng)):
+            accuracy, latency = replay.evaluate(candidate)
+            results.append((candidate, accuracy, latency))
+            limit = candidate["phrase_time_limit"] or "hop"
+            print(f"{index:>3} {candidate['pause_threshold']:>6.2f} {candidate['phrase_threshold']:>7.2f} "
+                  f"{candidate['non_speaking_duration']:>7.2f} {limit:>6} {accuracy:>8.1%} {latency:>8.2f}s")
+    finally:
+        replay.save_cache()
+
+    # Fastest setting that meets the target, or the most accurate one if none does
+    passing = [result for result in results if result[1] >= target_accuracy]
+    if passing:
+        best = min(passing, key=lambda result: result[2])
+    else:
+        print(f"\nNo setting reached {target_accuracy:.0%}; keeping the most accurate one")
+        best = max(results, key=lambda result: (result[1], -result[2]))
+    return base_name, best
+
+
+def write_profile(base_name, best, corpus_dir, path):
+    candidate, accuracy, latency = best
+    profile = {
+        "extends": base_name,
+        "label": "Tuned",
+        "title": "Tuned Speech Transcriber",
+        "order": 5,
+    }
+    profile.update(candidate)
+    base = PROFILES[base_name]
+    if base["mode"] == "realtime":
+        # Keep the finalizer's pauses as far past the new pause threshold as the base's
+        shift = candidate["pause_threshold"] - base["pause_threshold"]
+        for key in ("finalize_pause", "finalize_confident_pause"):
+            profile[key] = round(base[key] + shift, 2)
+    profile["tuning"] = {
+        "corpus": os.path.abspath(corpus_dir),
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "accuracy": round(accuracy, 4),
+        "mean_latency_seconds": round(latency, 3),
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+        f.write("\n")
+    print(f"\nBest profile (accuracy {accuracy:.1%}, latency {latency:.2f}s) saved to: {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune transcriber profile settings on a labelled corpus")
+    parser.add_argument("corpus", help="directory of <name>.wav clips with <name>.txt transcripts")
+    parser.add_argument("--base", default="fast", choices=[name for name in PROFILES if name != "tuned"],
+                        help="profile to start from")
+    parser.add_argument("--target-accuracy", type=float, default=0.9, help="minimum 1 - WER (default 0.9)")
+    parser.add_argument("--trials", type=int, default=30, help="random settings to try (default 30)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(PROFILES_DIR, "tuned.json"))
+    args = parser.parse_args()
+
+    base_name, best = tune(args.corpus, args.base, args.target_accuracy, args.trials, args.seed)
+    write_profile(base_name, best, args.corpus, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Callback Capture for Speech Transcriber
+A microphone source driven by PyAudio's stream callback: PortAudio's own
+thread pushes fixed-size frames into a bounded buffer, and the listener
+only ever waits on that buffer, never on the device
+"""
+
+import collections
+import threading
+
+import speech_recognition as sr
+
+import metrics
+
+# Pa_Initialize/Pa_Terminate and opening or closing a stream are not thread
+# safe, so sources started together take turns at them
+PORTAUDIO_LOCK = threading.Lock()
+
+
+class CallbackMicrophone(sr.AudioSource):
+    """Drop-in replacement for ``sr.Microphone`` using callback-mode capture
+
+    The device stream stays open across captures while it is held with
+    ``open()``, so no audio is lost between one ``listen`` call and the
+    next. Up to ``max_buffer_seconds`` of audio is buffered for the
+    listener; if it falls further behind, the oldest frames are dropped and
+    counted as queue overruns. Overflow and underflow flags reported by
+    PortAudio are counted as device overruns and underruns.
+    """
+
+    def __init__(self, device_index=None, sample_rate=None, chunk_size=1024, max_buffer_seconds=5.0):
+        self.pyaudio_module = sr.Microphone.get_pyaudio()
+        with PORTAUDIO_LOCK:
+            audio = self.pyaudio_module.PyAudio()
+            try:
+                if device_index is not None:
+                    info = audio.get_device_info_by_index(device_index)
+                else:
+                    info = audio.get_default_input_device_info()
+                if sample_rate is None:
+                    sample_rate = int(info["defaultSampleRate"])
+            finally:
+                audio.terminate()
+
+        self.device_index = device_index
+        self.format = self.pyaudio_module.paInt16
+        self.SAMPLE_WIDTH = self.pyaudio_module.get_sample_size(self.format)
+        self.SAMPLE_RATE = sample_rate
+        self.CHUNK = chunk_size
+        # Device format; SAMPLE_RATE/SAMPLE_WIDTH may be rewritten by the resampler
+        self.frame_bytes = self.SAMPLE_WIDTH
+        self.device_rate = sample_rate
+
+        self.condition = threading.Condition()
+        self.frames = collections.deque()
+        self.buffered_bytes = 0
+        self.max_buffered_bytes = int(max_buffer_seconds * sample_rate) * self.frame_bytes
+        self.interrupted = False
+        self.overruns = 0
+        self.underruns = 0
+        self.dropped_frames = 0
+        self.dropped_seconds = 0.0  # lets the sample clock count dropped audio
+
+        self.audio = None
+        self.device_stream = None
+        self.holds = 0
+        self.stream = None
+
+    # Device lifetime
+
+    def open(self):
+        """Start (or keep) the device stream running; pair with ``close``"""
+        with self.condition:
+            self.holds += 1
+            self.interrupted = False
+            if self.device_stream is not None:
+                return
+            self.frames.clear()
+            self.buffered_bytes = 0
+        with PORTAUDIO_LOCK:
+            self.audio = self.pyaudio_module.PyAudio()
+            try:
+                self.device_stream = self.audio.open(
+                    input_device_index=self.device_index, channels=1, format=self.format,
+                    rate=self.device_rate, frames_per_buffer=self.CHUNK, input=True,
+                    stream_callback=self._callback,
+                )
+            except Exception:
+                self.audio.terminate()
+                self.audio = None
+                with self.condition:
+                    self.holds -= 1
+                raise
+
+    def close(self):
+        with self.condition:
+            self.holds -= 1
+            if self.holds > 0 or self.device_stream is None:
+                return
+            device_stream, self.device_stream = self.device_stream, None
+            self.condition.notify_all()
+        with PORTAUDIO_LOCK:
+            try:
+                if device_stream.is_active():
+                    device_stream.stop_stream()
+                device_stream.close()
+            finally:
+                self.audio.terminate()
+                self.audio = None
+
+    def interrupt(self):
+        """Wake a blocked ``read`` so its caller can notice a stop request"""
+        with self.condition:
+            self.interrupted = True
+            self.condition.notify_all()
+
+    def __enter__(self):
+        self.open()
+        self.stream = _CallbackStream(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+        self.close()
+
+    # PortAudio thread
+
+    def _callback(self, in_data, frame_count, time_info, status_flags):
+        if status_flags & self.pyaudio_module.paInputOverflow:
+            self.overruns += 1
+            metrics.CAPTURE_OVERRUNS.labels(stage="device").inc()
+        if status_flags & self.pyaudio_module.paInputUnderflow:
+            self.underruns += 1
+            metrics.CAPTURE_UNDERRUNS.inc()
+        with self.condition:
+            self.frames.append(in_data)
+            self.buffered_bytes += len(in_data)
+            # The listener is behind: keep the newest audio
+            while self.buffered_bytes > self.max_buffered_bytes:
+                dropped = self.frames.popleft()
+                self.buffered_bytes -= len(dropped)
+                self.dropped_frames += 1
+                self.dropped_seconds += len(dropped) / (self.frame_bytes * self.device_rate)
+                metrics.CAPTURE_OVERRUNS.labels(stage="queue").inc()
+            self.condition.notify_all()
+        return None, self.pyaudio_module.paContinue
+
+    # Listener thread
+
+    def read(self, size):
+        """Return ``size`` frames, waiting for the callback to deliver them
+
+        Returns early (possibly empty) after ``interrupt`` or when the
+        device stream is closed.
+        """
+        wanted = size * self.frame_bytes
+        chunks = []
+        with self.condition:
+            while True:
+                while self.frames and wanted > 0:
+                    frame = self.frames.popleft()
+                    self.buffered_bytes -= len(frame)
+                    if len(frame) > wanted:
+                        # Put the rest back for the next read
+                        self.frames.appendleft(frame[wanted:])
+                        self.buffered_bytes += len(frame) - wanted
+                        frame = frame[:wanted]
+                    chunks.append(frame)
+                    wanted -= len(frame)
+                if wanted <= 0 or self.interrupted or self.device_stream is None:
+                    self.interrupted = False
+                    return b"".join(chunks)
+                self.condition.wait()
+
+    def stats_summary(self):
+        return (f"Capture: {self.overruns} device overruns, {self.underruns} underruns, "
+                f"{self.dropped_frames} frames dropped while the listener was behind")
+
+    @staticmethod
+    def list_microphone_names():
+        return sr.Microphone.list_microphone_names()
+
+
+class _CallbackStream:
+    """The ``source.stream`` object ``Recognizer.listen`` reads from"""
+
+    def __init__(self, microphone):
+        self.microphone = microphone
+
+    def read(self, size):
+        return self.microphone.read(size)
+
+    def close(self):
+        pass  # the device stays open until the microphone's last holder closes it
@@ -0,0 +1,132 @@
+"""
+Capture State Machine for Speech Transcriber
+Event-driven ownership of the microphone for start, stop and refresh
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class CaptureStopped(Exception):
+    """Raised inside a microphone read once its capture run has been stopped"""
+
+
+class CaptureController:
+    """Owns the microphone state for the listening threads
+
+    Every ``start`` opens a new run identified by a generation number.
+    ``stop`` ends the current run without waiting for its thread: the
+    thread's next microphone read raises ``CaptureStopped`` and ownership
+    is handed back through a condition variable, so nothing polls or sleeps.
+
+        idle --start--> running --stop--> stopping --released--> idle
+        idle --begin_refresh--> refreshing --end_refresh--> idle
+    """
+
+    IDLE = "idle"
+    RUNNING = "running"
+    STOPPING = "stopping"
+    REFRESHING = "refreshing"
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.state = self.IDLE
+        self.generation = 0
+        self.owner = None  # generation of the run currently holding the microphone
+        self.on_stop = None  # called after a stop, e.g. to wake a reader blocked on the device
+
+    @property
+    def in_use(self):
+        return self.owner is not None
+
+    def start(self):
+        """Begin a new capture run and return its generation"""
+        with self.condition:
+            while self.state == self.REFRESHING:
+                self.condition.wait()
+            self.generation += 1
+            self.state = self.RUNNING
+            self.condition.notify_all()
+            return self.generation
+
+    def stop(self):
+        """End the current run; returns immediately"""
+        with self.condition:
+            if self.state == self.RUNNING:
+                self.generation += 1  # invalidates the running generation
+                self.state = self.STOPPING if self.owner is not None else self.IDLE
+                self.condition.notify_all()
+        if self.on_stop:
+            self.on_stop()
+
+    def is_active(self, generation):
+        """True while ``generation`` is the current, running capture"""
+        return self.state == self.RUNNING and generation == self.generation
+
+    @contextmanager
+    def ownership(self, generation):
+        """Hold the microphone for ``generation``; yields False if the run is already over"""
+        with self.condition:
+            # Wait for a previous run (or a refresh) to release the device
+            while self.owner is not None or self.state == self.REFRESHING:
+                if not self.is_active(generation):
+                    break
+                self.condition.wait()
+            if not self.is_active(generation) or self.owner is not None:
+                owned = False
+            else:
+                self.owner = generation
+                owned = True
+        try:
+            yield owned
+        finally:
+            if owned:
+                with self.condition:
+                    self.owner = None
+                    if self.state == self.STOPPING:
+                        self.state = self.IDLE
+                    self.condition.notify_all()
+
+    def begin_refresh(self, timeout=None):
+        """Stop capturing and wait for the device to be released; returns False on timeout"""
+        self.stop()
+        with self.condition:
+            released = self.condition.wait_for(lambda: self.owner is None, timeout)
+            if released:
+                self.state = self.REFRESHING
+            return released
+
+    def end_refresh(self):
+        with self.condition:
+            if self.state == self.REFRESHING:
+                self.state = self.IDLE
+            self.condition.notify_all()
+
+    def wrap(self, stream, generation):
+        """Make microphone reads for ``generation`` abort as soon as it is stopped"""
+        return StoppableStream(stream, self, generation)
+
+
+class StoppableStream:
+    """Microphone stream wrapper that turns a stop request into CaptureStopped
+
+    ``Recognizer.listen`` reads one chunk at a time, so a stop or refresh
+    takes effect within a single chunk instead of after the listen timeout.
+    The check is repeated after the read, which a stop may cut short.
+    """
+
+    def __init__(self, stream, controller, generation):
+        self.stream = stream
+        self.controller = controller
+        self.generation = generation
+
+    def read(self, size):
+        if not self.controller.is_active(self.generation):
+            raise CaptureStopped()
+        buffer = self.stream.read(size)
+        if not self.controller.is_active(self.generation):
+            raise CaptureStopped()
+        return buffer
+
+    def close(self):
+        self.stream.close()
@@ -0,0 +1,226 @@
+"""
+Overlapping-Window Chunking for Speech Transcriber
+Splits long speech into overlapping windows, recognizes them in parallel
+and stitches the hypotheses back together without duplicated words
+"""
+
+import difflib
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import speech_recognition as sr
+
+
+def _normalize(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class OverlapChunker:
+    """Cuts continuous speech into fixed-length windows with overlap
+
+    Captures arrive one hop (``window - overlap`` seconds) at a time; when a
+    capture continues the previous one, the tail of the previous capture is
+    prepended so words straddling the boundary appear whole in one window.
+    """
+
+    def __init__(self, window_seconds=5.0, overlap_seconds=1.0):
+        if overlap_seconds >= window_seconds:
+            raise ValueError("Overlap must be shorter than the window")
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+        self.previous = None
+
+    @property
+    def hop_seconds(self):
+        """Length of new audio per window, used as the listen phrase_time_limit"""
+        return self.window_seconds - self.overlap_seconds
+
+    def hit_time_limit(self, audio):
+        """True if ``audio`` was most likely cut off by the hop time limit"""
+        duration = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+        return duration >= self.hop_seconds
+
+    def next_window(self, audio, continued):
+        """Return the window to recognize for a new capture"""
+        window = audio
+        if continued and self.previous is not None and self._compatible(self.previous, audio):
+            overlap_bytes = self._bytes_for(audio, self.overlap_seconds)
+            tail = self.previous.frame_data[-overlap_bytes:]
+            window = sr.AudioData(tail + audio.frame_data, audio.sample_rate, audio.sample_width)
+        self.previous = audio
+        return window
+
+    def split(self, audio):
+        """Split an already captured AudioData into overlapping windows"""
+        window_bytes = self._bytes_for(audio, self.window_seconds)
+        hop_bytes = self._bytes_for(audio, self.hop_seconds)
+        data = audio.frame_data
+        if len(data) <= window_bytes:
+            return [audio]
+
+        windows = []
+        start = 0
+        while True:
+            windows.append(sr.AudioData(data[start:start + window_bytes], audio.sample_rate, audio.sample_width))
+            if start + window_bytes >= len(data):
+                break
+            start += hop_bytes
+        return windows
+
+    def reset(self):
+        self.previous = None
+
+    @staticmethod
+    def _bytes_for(audio, seconds):
+        frames = int(seconds * audio.sample_rate)
+        return frames * audio.sample_width
+
+    @staticmethod
+    def _compatible(first, second):
+        return first.sample_rate == second.sample_rate and first.sample_width == second.sample_width
+
+
+class TranscriptStitcher:
+    """Merges hypotheses of overlapping windows into one running transcript
+
+    The last ``holdback_words`` of every window are held back until the next
+    window arrives, because those words sit in the overlap and are the most
+    likely to have been cut mid-word. Alignment uses the longest run of
+    matching words between the end of the previous window and the start of
+    the next one.
+    """
+
+    def __init__(self, holdback_words=3, context_words=6):
+        self.holdback_words = holdback_words
+        self.context_words = context_words
+        self.reset()
+
+    def reset(self):
+        self.emitted = []
+        self.held = []
+
+    def add(self, text, final=False):
+        """Add the next window's text; returns newly committed text"""
+        words = text.split()
+        context = self.emitted[-self.context_words:]
+        reference = context + self.held
+
+        start = 0
+        kept = list(self.held)
+        if reference and words:
+            head = words[:len(reference) + self.holdback_words]
+            matcher = difflib.SequenceMatcher(
+                None, [_normalize(w) for w in reference], [_normalize(w) for w in head], autojunk=False)
+            match = matcher.find_longest_match(0, len(reference), 0, len(head))
+            if match.size:
+                # Keep the previous window up to the match, continue with the new one after it
+                reference_end = match.a + match.size
+                kept = reference[len(context):reference_end] if reference_end > len(context) else []
+                start = match.b + match.size
+
+        pending = kept + words[start:]
+        if final or len(pending) <= self.holdback_words:
+            committed, self.held = (pending, []) if final else ([], pending)
+        else:
+            committed = pending[:-self.holdback_words]
+            self.held = pending[-self.holdback_words:]
+
+        self.emitted.extend(committed)
+        self.emitted = self.emitted[-self.context_words:]
+        if final:
+            self.emitted = []
+        return " ".join(committed)
+
+    def flush(self):
+        """Commit anything still held back"""
+        committed = " ".join(self.held)
+        self.reset()
+        return committed
+
+
+def stitch_transcripts(hypotheses, holdback_words=3):
+    """Stitch an ordered list of overlapping window hypotheses into one string"""
+    stitcher = TranscriptStitcher(holdback_words=holdback_words)
+    parts = [stitcher.add(text) for text in hypotheses]
+    parts.append(stitcher.flush())
+    return " ".join(part for part in parts if part)
+
+
+class WindowedRecognizer:
+    """Recognizes overlapping windows in parallel and stitches them in order
+
+    ``recognize_fn(window, traces)`` turns an AudioData into text (raising
+    ``sr.UnknownValueError`` for silence); ``on_text(text, traces)`` receives
+    committed text as soon as the windows before it have been stitched.
+    Windows run on ``executor`` when given, otherwise on a private pool.
+    """
+
+    def __init__(self, recognize_fn, on_text, window_seconds=5.0, overlap_seconds=1.0, max_workers=3,
+                 executor=None):
+        self.recognize_fn = recognize_fn
+        self.on_text = on_text
+        self.chunker = OverlapChunker(window_seconds, overlap_seconds)
+        self.stitcher = TranscriptStitcher()
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="window-recognizer")
+        self.pool = executor
+        self.results = queue.Queue()
+        self.continuing = False
+
+        threading.Thread(target=self._stitch_loop, name="window-stitcher", daemon=True).start()
+
+    @property
+    def hop_seconds(self):
+        return self.chunker.hop_seconds
+
+    def resize(self, window_seconds, overlap_seconds):
+        """Change the window and overlap lengths; ignored while a long utterance is in progress"""
+        if self.continuing or (window_seconds, overlap_seconds) == (self.chunker.window_seconds,
+                                                                   self.chunker.overlap_seconds):
+            return
+        if overlap_seconds >= window_seconds:
+            raise ValueError("Overlap must be shorter than the window")
+        self.chunker.window_seconds = window_seconds
+        self.chunker.overlap_seconds = overlap_seconds
+        self.chunker.reset()
+
+    def add_capture(self, audio, trace=None):
+        """Submit a capture; returns True if it belongs to a long utterance"""
+        cut = self.chunker.hit_time_limit(audio)
+        if not cut and not self.continuing:
+            # Short, self-contained phrase; let the caller handle it
+            self.chunker.reset()
+            return False
+
+        window = self.chunker.next_window(audio, self.continuing)
+        traces = [trace] if trace is not None else []
+        self.results.put((self.pool.submit(self._recognize, window, traces), not cut, traces))
+        self.continuing = cut
+        return True
+
+    def finish(self):
+        """End the current long utterance, e.g. after a listen timeout"""
+        if self.continuing:
+            self.continuing = False
+            self.chunker.reset()
+            self.results.put((None, True, []))
+
+    def _recognize(self, window, traces):
+        try:
+            return self.recognize_fn(window, traces)
+        except sr.UnknownValueError:
+            return ""
+
+    def _stitch_loop(self):
+        while True:
+            future, final, traces = self.results.get()
+            try:
+                text = future.result() if future is not None else ""
+            except Exception as e:
+                print(f"Window recognition error: {e}")
+                text = ""
+            committed = self.stitcher.add(text, final=final)
+            if committed:
+                self.on_text(committed, traces)
@@ -0,0 +1,172 @@
+"""
+Latency Tracing for Speech Transcriber
+Per-utterance stage timestamps, structured logs and latency histograms
+"""
+
+import bisect
+import itertools
+import json
+import os
+import threading
+import time
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of millisecond latencies"""
+
+    BUCKETS_MS = (10, 25, 50, 100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value_ms):
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket containing the given fraction of samples"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        running = 0
+        for index, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                return float(self.BUCKETS_MS[index]) if index < len(self.BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class UtteranceTrace:
+    """Timestamps of one utterance on its way from the speaker to the screen"""
+
+    STAGES = (
+        "speech_start", "speech_end", "enqueue", "encode",
+        "request_sent", "response_received", "finalized", "rendered",
+    )
+
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+        self.stamps = {}
+        self.speaker_turn = None  # set by the speaker-turn detector when the capture is analysed
+        self.audio_span = None    # (offset, duration) seconds in the session's audio archive
+        self.speech_span = None   # (start, end) seconds on the session's sample clock
+
+    def mark(self, stage, when=None):
+        self.stamps[stage] = when if when is not None else time.time()
+
+    def get(self, stage):
+        return self.stamps.get(stage)
+
+    def interval_ms(self, start_stage, end_stage):
+        start, end = self.stamps.get(start_stage), self.stamps.get(end_stage)
+        if start is None or end is None:
+            return None
+        return (end - start) * 1000
+
+    def to_dict(self):
+        record = {
+            "trace_id": self.trace_id,
+            "stages": {stage: self.stamps[stage] for stage in self.STAGES if stage in self.stamps},
+        }
+        if self.speaker_turn is not None:
+            record["speaker_turn"] = self.speaker_turn
+        return record
+
+
+class LatencyTracker:
+    """Collects finished traces into histograms and a JSON-lines log
+
+    Each session writes ``latency_<date>_<time>.jsonl`` next to the
+    transcription logs, one record per utterance with its stage timestamps
+    and the derived per-stage intervals.
+    """
+
+    INTERVALS = (
+        ("endpoint", "speech_end", "enqueue"),
+        ("encode", "enqueue", "encode"),
+        ("queue", "encode", "request_sent"),
+        ("recognition", "request_sent", "response_received"),
+        ("finalize", "response_received", "finalized"),
+        ("render", "finalized", "rendered"),
+        ("total", "speech_end", "rendered"),
+    )
+
+    def __init__(self, logs_dir):
+        self.logs_dir = logs_dir
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.histograms = {name: LatencyHistogram() for name, _, _ in self.INTERVALS}
+        self.log_file = None
+
+    def start_session(self, session_start_time):
+        """Open the structured log for a new session and reset the histograms"""
+        self.end_session()
+        filename = f"latency_{session_start_time.strftime('%Y-%m-%d_%H-%M-%S')}.jsonl"
+        with self.lock:
+            self.histograms = {name: LatencyHistogram() for name, _, _ in self.INTERVALS}
+            try:
+                self.log_file = open(os.path.join(self.logs_dir, filename), "a", encoding="utf-8")
+            except OSError as e:
+                print(f"Error opening latency log: {e}")
+                self.log_file = None
+
+    def end_session(self):
+        with self.lock:
+            if self.log_file:
+                self.log_file.close()
+                self.log_file = None
+
+    def begin(self, audio, captured_at=None, pause_threshold=0.0, non_speaking_duration=0.0, speech_span=None):
+        """Start a trace for a captured phrase
+
+        ``speech_span`` is the (start, end) wall-clock time of the speech as
+        measured on the sample clock. Without it the span is estimated:
+        ``Recognizer.listen`` returns ``pause_threshold`` seconds after the
+        speaker stopped and keeps ``non_speaking_duration`` of padding on
+        both sides.
+        """
+        captured_at = captured_at if captured_at is not None else time.time()
+        if speech_span is None or None in speech_span:
+            duration = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+            speech_end = captured_at - pause_threshold
+            speech_span = speech_end - max(0.0, duration - 2 * non_speaking_duration), speech_end
+
+        trace = UtteranceTrace(next(self.ids))
+        trace.mark("speech_start", speech_span[0])
+        trace.mark("speech_end", speech_span[1])
+        trace.mark("enqueue", captured_at)
+        return trace
+
+    def complete(self, trace):
+        """Record a rendered trace in the histograms and the session log"""
+        intervals = {}
+        for name, start_stage, end_stage in self.INTERVALS:
+            value = trace.interval_ms(start_stage, end_stage)
+            if value is not None:
+                intervals[name] = round(value, 1)
+
+        record = trace.to_dict()
+        record["intervals_ms"] = intervals
+        with self.lock:
+            for name, value in intervals.items():
+                self.histograms[name].observe(value)
+            if self.log_file:
+                self.log_file.write(json.dumps(record) + "\n")
+                self.log_file.flush()
+
+    def summary_lines(self):
+        """Human readable p50/p90 per stage, for the console and the live panel"""
+        lines = []
+        with self.lock:
+            for name, _, _ in self.INTERVALS:
+                histogram = self.histograms[name]
+                if histogram.count:
+                    lines.append(f"{name:<12} p50 {histogram.percentile(0.5):>6.0f} ms  "
+                                 f"p90 {histogram.percentile(0.9):>6.0f} ms  (n={histogram.count})")
+        return lines
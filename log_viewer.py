@@ -10,6 +10,7 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 from datetime import datetime
 import glob
+import threading
 
 class LogViewer:
     def __init__(self):
@@ -21,6 +22,8 @@ class LogViewer:
         self.logs_dir = "transcription_logs"
         self.log_files = []
         self.current_log_data = None
+        self.entry_lines = {}  # text area line number -> transcription shown on it
+        self.archive_reader = None
         
         self.setup_gui()
         self.load_log_files()
@@ -50,6 +53,10 @@ class LogViewer:
         export_btn = tk.Button(control_frame, text="Export", command=self.export_log)
         export_btn.pack(side=tk.LEFT, padx=5)
         
+        # Play button (sessions recorded with --archive-audio)
+        play_btn = tk.Button(control_frame, text="Play Entry", command=self.play_selected_entry)
+        play_btn.pack(side=tk.LEFT, padx=5)
+        
         # Search frame
         search_frame = tk.Frame(self.root)
         search_frame.pack(pady=5, fill=tk.X, padx=10)
@@ -78,6 +85,7 @@ class LogViewer:
         # Transcriptions display
         self.text_area = scrolledtext.ScrolledText(content_frame, font=("Arial", 11))
         self.text_area.pack(fill=tk.BOTH, expand=True)
+        self.text_area.bind('<Double-Button-1>', lambda event: self.play_selected_entry())
     
     def load_log_files(self):
         """Load all JSON log files from the logs directory"""
@@ -98,10 +106,14 @@ class LogViewer:
                 if filename.startswith("transcription_"):
                     # Remove "transcription_" prefix and ".json" suffix
                     date_time_part = filename[14:-5]  # Remove "transcription_" and ".json"
+                    # Multi-source sessions end in "_<source label>"
+                    source = date_time_part[20:]
                     try:
                         # Parse the date and time
-                        dt = datetime.strptime(date_time_part, "%Y-%m-%d_%H-%M-%S")
+                        dt = datetime.strptime(date_time_part[:19], "%Y-%m-%d_%H-%M-%S")
                         display_name = dt.strftime("%Y-%m-%d %H:%M:%S")
+                        if source:
+                            display_name += f" ({source})"
                     except ValueError:
                         display_name = filename
                 else:
@@ -154,11 +166,14 @@ class LogViewer:
             return
         
         self.text_area.delete(1.0, tk.END)
+        self.entry_lines = {}
         
         # Display session info
         session_info = f"Session Information:\n"
         session_info += f"Start Time: {self.current_log_data.get('start_time', 'Unknown')}\n"
         session_info += f"End Time: {self.current_log_data.get('end_time', 'Unknown')}\n"
+        if 'source' in self.current_log_data:
+            session_info += f"Source: {self.current_log_data['source']}\n"
         session_info += f"Duration: {self.current_log_data.get('duration_minutes', 0):.1f} minutes\n"
         session_info += f"Total Transcriptions: {len(self.current_log_data.get('transcriptions', []))}\n"
         
@@ -178,14 +193,32 @@ class LogViewer:
         
         # Display transcriptions
         transcriptions = self.current_log_data.get('transcriptions', [])
+        previous_turn = None
         for trans in transcriptions:
-            if 'full_entry' in trans:
-                self.text_area.insert(tk.END, trans['full_entry'] + "\n")
-            else:
-                # Fallback for older format
-                timestamp = trans.get('timestamp', 'Unknown')
-                text = trans.get('text', '')
-                self.text_area.insert(tk.END, f"[{timestamp}] {text}\n")
+            # Leave a blank line where the speaker changes
+            turn = trans.get('speaker_turn')
+            if previous_turn is not None and turn != previous_turn:
+                self.text_area.insert(tk.END, "\n")
+            previous_turn = turn
+            self.insert_entry(trans)
+    
+    def insert_entry(self, trans):
+        """Append one transcription line and remember which entry it shows"""
+        line = int(self.text_area.index("end-1c").split(".")[0])
+        self.entry_lines[line] = trans
+        self.text_area.insert(tk.END, self.format_entry(trans) + "\n")
+    
+    def format_entry(self, trans):
+        """One transcription as a display line, tagged with its speaker turn"""
+        if 'full_entry' in trans:
+            entry = trans['full_entry']
+        else:
+            # Fallback for older format
+            entry = f"[{trans.get('timestamp', 'Unknown')}] {trans.get('text', '')}"
+        if 'speaker_turn' in trans:
+            timestamp, _, text = entry.partition("] ")
+            entry = f"{timestamp}] [Turn {trans['speaker_turn']}] {text}"
+        return entry
     
     def update_statistics(self):
         """Update the statistics display"""
@@ -205,6 +238,9 @@ class LogViewer:
         words_per_minute = total_words / duration if duration > 0 else 0
         
         stats_text = f"Transcriptions: {len(transcriptions)} | Words: {total_words} | Duration: {duration:.1f} min | WPM: {words_per_minute:.1f}"
+        turns = {trans['speaker_turn'] for trans in transcriptions if 'speaker_turn' in trans}
+        if turns:
+            stats_text += f" | Speaker turns: {len(turns)}"
         self.stats_label.config(text=stats_text)
     
     def on_search_changed(self, event=None):
@@ -226,21 +262,52 @@ class LogViewer:
         
         # Display filtered content
         self.text_area.delete(1.0, tk.END)
+        self.entry_lines = {}
         
         if filtered_transcriptions:
             self.text_area.insert(tk.END, f"Search Results for '{search_term}' ({len(filtered_transcriptions)} matches):\n")
             self.text_area.insert(tk.END, "-" * 50 + "\n\n")
             
             for trans in filtered_transcriptions:
-                if 'full_entry' in trans:
-                    self.text_area.insert(tk.END, trans['full_entry'] + "\n")
-                else:
-                    timestamp = trans.get('timestamp', 'Unknown')
-                    text = trans.get('text', '')
-                    self.text_area.insert(tk.END, f"[{timestamp}] {text}\n")
+                self.insert_entry(trans)
         else:
             self.text_area.insert(tk.END, f"No matches found for '{search_term}'")
     
+    def play_selected_entry(self):
+        """Play the archived audio of the entry under the cursor"""
+        line = int(self.text_area.index(tk.INSERT).split(".")[0])
+        trans = self.entry_lines.get(line)
+        if trans is None:
+            return
+        archive = self.current_log_data.get('audio_archive')
+        if not archive or 'audio_offset' not in trans:
+            self.stats_label.config(text="No archived audio for this entry")
+            return
+        
+        try:
+            from audio_archive import AudioArchiveReader, play_pcm
+            
+            path = os.path.join(self.logs_dir, archive)
+            if self.archive_reader is None or self.archive_reader.path != path:
+                self.archive_reader = AudioArchiveReader(path)
+            reader = self.archive_reader
+            # Only the chunks covering this entry are read and decompressed
+            pcm = reader.read(trans['audio_offset'], trans.get('audio_duration', 0))
+        except Exception as e:
+            messagebox.showerror("Error", f"Error reading audio archive: {e}")
+            return
+        
+        def play():
+            try:
+                play_pcm(pcm, reader.sample_rate, reader.sample_width)
+            except Exception as e:
+                message = f"Error playing audio: {e}"
+                self.root.after(0, messagebox.showerror, "Error", message)
+        
+        self.stats_label.config(text=f"Playing {len(pcm) / (reader.sample_rate * reader.sample_width):.1f} s "
+                                     f"from {trans['audio_offset']:.1f} s")
+        threading.Thread(target=play, name="playback", daemon=True).start()
+    
     def clear_search(self):
         """Clear the search and show all content"""
         self.search_var.set("")
@@ -273,12 +340,7 @@ class LogViewer:
                     
                     # Write transcriptions
                     for trans in self.current_log_data.get('transcriptions', []):
-                        if 'full_entry' in trans:
-                            f.write(trans['full_entry'] + "\n")
-                        else:
-                            timestamp = trans.get('timestamp', 'Unknown')
-                            text = trans.get('text', '')
-                            f.write(f"[{timestamp}] {text}\n")
+                        f.write(self.format_entry(trans) + "\n")
                 
                 messagebox.showinfo("Success", f"Log exported to: {file_path}")
                 
@@ -0,0 +1,416 @@
+"""
+Metrics for Speech Transcriber
+Counters, gauges and histograms exposed in Prometheus text format over a
+local HTTP endpoint
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+DEFAULT_PORT = 9464
+
+
+class _ThreadCells:
+    """Per-thread value arrays that are only summed when scraped
+
+    Each thread increments its own list without taking a lock; the scrape
+    adds all lists together. Cells of threads that have exited are folded
+    into ``retired`` so short-lived recognition threads do not pile up.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.cells = []  # (thread, cell)
+        self.retired = [0] * size
+
+    def cell(self):
+        try:
+            return self.local.cell
+        except AttributeError:
+            cell = [0] * self.size
+            with self.lock:
+                self.cells.append((threading.current_thread(), cell))
+            self.local.cell = cell
+            return cell
+
+    def merged(self):
+        with self.lock:
+            alive = []
+            for thread, cell in self.cells:
+                if thread.is_alive():
+                    alive.append((thread, cell))
+                else:
+                    self.retired = [a + b for a, b in zip(self.retired, cell)]
+            self.cells = alive
+            totals = list(self.retired)
+            for _, cell in alive:
+                totals = [a + b for a, b in zip(totals, cell)]
+        return totals
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Shared label handling; unlabelled metrics are their own only child"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children_lock = threading.Lock()
+        self.children = {}
+        if not self.labelnames:
+            self.labels()  # export unlabelled metrics as zero from the start
+
+    def labels(self, **labels):
+        """Return the child for one combination of label values"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self.children.get(key)
+        if child is None:
+            with self.children_lock:
+                child = self.children.setdefault(key, self._new_child())
+        return child
+
+    def _only_child(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels, use .labels() first")
+        return self.labels()
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self.children_lock:
+            children = list(self.children.items())
+        for key, child in children:
+            lines.extend(self._samples(key, child))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self.cells = _ThreadCells(1)
+
+    def inc(self, amount=1):
+        self.cells.cell()[0] += amount
+
+    def value(self):
+        return self.cells.merged()[0]
+
+
+class Counter(_Metric):
+    """Monotonic count, incremented without locks on the hot path"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._only_child().inc(amount)
+
+    def _samples(self, key, child):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value())}"]
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = 0.0
+        self.function = None
+
+    def set(self, value):
+        with self.lock:
+            self.current = value
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.current += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """Read the value from ``function()`` at scrape time (queue sizes, lags)"""
+        self.function = function
+
+    def value(self):
+        if self.function is not None:
+            try:
+                return self.function()
+            except Exception:
+                return float("nan")
+        return self.current
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, either set directly or read on scrape"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._only_child().set(value)
+
+    def inc(self, amount=1):
+        self._only_child().inc(amount)
+
+    def dec(self, amount=1):
+        self._only_child().dec(amount)
+
+    def set_function(self, function):
+        self._only_child().set_function(function)
+
+    def _samples(self, key, child):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value())}"]
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Layout: one count per bucket, +Inf, sum, count
+        self.cells = _ThreadCells(len(buckets) + 3)
+
+    def observe(self, value):
+        cell = self.cells.cell()
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        cell[index] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._only_child().observe(value)
+
+    def time(self):
+        """Context manager observing the elapsed wall time in seconds"""
+        return _Timer(self._only_child())
+
+    def _samples(self, key, child):
+        totals = child.cells.merged()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), totals):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(float(totals[-2]))}")
+        lines.append(f"{self.name}_count{labels} {totals[-1]}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together on every scrape"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+
+    def _register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered as {existing.kind}")
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Pipeline metrics shared by all transcriber versions
+CAPTURES = REGISTRY.counter(
+    "transcriber_captures_total", "Phrases returned by the microphone listener")
+CAPTURE_OVERRUNS = REGISTRY.counter(
+    "transcriber_capture_overruns_total",
+    "Audio lost to overruns, by stage: the device buffer or the queue to the listener", ["stage"])
+CAPTURE_UNDERRUNS = REGISTRY.counter(
+    "transcriber_capture_underruns_total", "Input underflows reported by the audio device")
+VAD_EVENTS = REGISTRY.counter(
+    "transcriber_vad_events_total", "Voice activity transitions seen on the microphone stream", ["event"])
+RECOGNITION_REQUESTS = REGISTRY.counter(
+    "transcriber_recognition_requests_total", "Recognition requests sent")
+RECOGNITION_ERRORS = REGISTRY.counter(
+    "transcriber_recognition_errors_total", "Failed recognition requests by kind", ["kind"])
+RECOGNITION_RETRIES = REGISTRY.counter(
+    "transcriber_recognition_retries_total", "Recognition requests sent again after a failure")
+RECOGNITION_AVOIDED = REGISTRY.counter(
+    "transcriber_recognition_requests_avoided_total", "Captures rejected as non-speech before recognition", ["reason"])
+RECOGNITION_LATENCY = REGISTRY.histogram(
+    "transcriber_recognition_latency_seconds", "Time from sending a recognition request to its response")
+CACHE_LOOKUPS = REGISTRY.counter(
+    "transcriber_cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
+ENCODER_CPU = REGISTRY.counter(
+    "transcriber_encoder_cpu_seconds_total",
+    "CPU time spent FLAC-encoding captured audio, preparing chunks during capture or finishing phrases", ["work"])
+WORDS = REGISTRY.counter(
+    "transcriber_words_total", "Words transcribed; rate() * 60 gives words per minute")
+RECOGNITION_THROTTLED = REGISTRY.counter(
+    "transcriber_recognition_throttled_total", "Recognition requests refused by the service for exceeding its quota")
+RECOGNITION_COALESCED = REGISTRY.counter(
+    "transcriber_recognition_coalesced_total", "Captures merged into another request because the quota was spent")
+RATE_LIMIT = REGISTRY.gauge(
+    "transcriber_rate_limit_requests_per_second", "Recognition request rate currently allowed for the default key")
+OVERLOAD_STAGE = REGISTRY.gauge(
+    "transcriber_overload_stage", "Degradation stage (0 normal, 1 merge, 2 local, 3 long windows, 4 shed)",
+    ["source"])
+OVERLOAD_TRANSITIONS = REGISTRY.counter(
+    "transcriber_overload_transitions_total", "Overload stage changes, by the stage entered", ["stage"])
+OVERLOAD_SHED = REGISTRY.counter(
+    "transcriber_overload_shed_captures_total",
+    "Captures not recognized because of overload, archived for re-transcription or dropped", ["action"])
+SPECULATIONS = REGISTRY.counter(
+    "transcriber_speculative_recognitions_total",
+    "Recognition requests started at pause onset, by outcome", ["outcome"])
+QUEUE_DEPTH = REGISTRY.gauge(
+    "transcriber_queue_depth", "Items waiting in internal queues", ["queue"])
+ARCHIVE_BYTES = REGISTRY.counter(
+    "transcriber_archive_bytes_total", "Compressed audio bytes written to session archives")
+ARCHIVE_DROPS = REGISTRY.counter(
+    "transcriber_archive_dropped_captures_total", "Captures not archived because the archive writer fell behind")
+SESSION_SPILLED = REGISTRY.counter(
+    "transcriber_session_spilled_records_total", "Transcriptions moved from memory to a session's spill file")
+PERSISTENCE_LAG = REGISTRY.gauge(
+    "transcriber_persistence_lag_seconds", "Age of the oldest transcription not yet written to disk")
+THREADS = REGISTRY.gauge(
+    "transcriber_threads", "Live Python threads")
+UPTIME = REGISTRY.gauge(
+    "transcriber_uptime_seconds", "Seconds since the process started")
+
+_process_start = time.time()
+THREADS.set_function(threading.active_count)
+UPTIME.set_function(lambda: time.time() - _process_start)
+
+
+@contextmanager
+def recognition_request():
+    """Count one recognition request, its latency and, if it fails, its error kind"""
+    RECOGNITION_REQUESTS.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        RECOGNITION_ERRORS.labels(kind=type(e).__name__).inc()
+        raise
+    finally:
+        RECOGNITION_LATENCY.observe(time.perf_counter() - start)
+
+
+def _handler_class(registry):
+    # http.server pulls in the email package; import it only when serving
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep scrapes out of the console
+
+    return MetricsHandler
+
+
+def start_http_server(port=None, host="127.0.0.1", registry=REGISTRY):
+    """Serve ``registry`` on http://host:port/metrics from a daemon thread
+
+    The port defaults to ``TRANSCRIBER_METRICS_PORT`` or 9464 and 0 disables
+    the endpoint. Returns the server, or None if it could not be started.
+    """
+    from http.server import ThreadingHTTPServer
+
+    if port is None:
+        port = int(os.environ.get("TRANSCRIBER_METRICS_PORT", DEFAULT_PORT))
+    if not port:
+        return None
+
+    try:
+        server = ThreadingHTTPServer((host, port), _handler_class(registry))
+    except OSError as e:
+        print(f"Metrics endpoint not started on port {port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"Metrics available at http://{host}:{port}/metrics")
+    return server
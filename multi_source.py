@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Multi-Source Transcriber
+Transcribes several microphones at once in one process. Every source has
+its own recognizer, voice activity detection and session log; all sources
+share one FLAC encoder and one fairly scheduled recognition pool.
+"""
+
+import argparse
+import os
+import threading
+import time
+from datetime import datetime
+
+import metrics
+from recognition_pool import RecognitionPool
+from session_log import SessionLog
+from startup import lazy_import
+from transcriber_engine import PROFILES, TranscriberEngine
+
+sr = lazy_import("speech_recognition")
+
+
+def parse_source(spec):
+    """``LABEL=DEVICE`` (or just ``DEVICE``) -> (label, device index or name)"""
+    label, _, device = spec.rpartition("=")
+    label = label or device
+    return label, int(device) if device.isdigit() else device
+
+
+def resolve_device(device, names):
+    """Index of ``device``, matching a name case-insensitively by substring"""
+    if isinstance(device, int):
+        if not 0 <= device < len(names):
+            raise ValueError(f"No input device {device}; see --list-devices")
+        return device
+    matches = [index for index, name in enumerate(names) if device.lower() in name.lower()]
+    if not matches:
+        raise ValueError(f"No input device matching '{device}'; see --list-devices")
+    return matches[0]
+
+
+class SourceSession(SessionLog):
+    """Transcriptions of one source, saved in the window's session format"""
+
+    def __init__(self, logs_dir, label, profile_name):
+        self.label = label
+        start_time = datetime.now()
+        safe_label = "".join(c if c.isalnum() or c in "-_" else "-" for c in label)
+        filename = f"transcription_{start_time.strftime('%Y-%m-%d_%H-%M-%S')}_{safe_label}.json"
+        header = {
+            "start_time": start_time.strftime("%Y-%m-%d %H:%M:%S"),
+            "profile": profile_name,
+            "source": label,
+        }
+        super().__init__(os.path.join(logs_dir, filename), header, start_time)
+
+    def save(self):
+        try:
+            filepath = super().save()
+        except Exception as e:
+            print(f"Error saving session for {self.label}: {e}")
+            return None
+        finally:
+            self.close()
+        if filepath:
+            print(f"Session for {self.label} saved to: {filepath}")
+        return filepath
+
+
+class MultiSourceTranscriber:
+    """One engine per source, all sharing the encoder and recognition pool"""
+
+    def __init__(self, sources, profile="fast", workers=4, logs_dir="transcription_logs", archive_audio=False):
+        from audio_encoder import EncoderStage
+
+        self.logs_dir = logs_dir
+        if not os.path.exists(self.logs_dir):
+            os.makedirs(self.logs_dir)
+        self.profile_name = profile
+        self.print_lock = threading.Lock()
+        self.running = False
+
+        self.pool = RecognitionPool(workers=workers)
+        self.encoder = EncoderStage()
+        self.engines = {}
+        self.sessions = {}
+        for label, device_index in sources:
+            engine = TranscriberEngine(self.logs_dir, source=label, device_index=device_index,
+                                       pool=self.pool, encoder=self.encoder)
+            engine.attach(self._on_transcription(label), lambda text: None, lambda text: None)
+            engine.apply_profile(profile)
+            engine.archive_audio = archive_audio
+            self.engines[label] = engine
+
+    def _on_transcription(self, label):
+        def on_transcription(text, traces, details):
+            engine = self.engines[label]
+            record = self.sessions[label].add(text, details, engine.timestamp(details))
+            with self.print_lock:
+                print(f"[{record['timestamp']}] [{label}] {text}", flush=True)
+            metrics.WORDS.inc(record["word_count"])
+            for trace in traces:
+                trace.mark("rendered")
+                engine.latency.complete(trace)
+        return on_transcription
+
+    def initialize(self):
+        """Open every source in turn, then calibrate them all in parallel
+
+        PortAudio's setup is not thread safe, so devices are opened one at a
+        time; only the calibration, which just reads audio, runs in parallel.
+        """
+        errors = {}
+        for label, engine in self.engines.items():
+            try:
+                engine.initialize(lambda message: None, self.profile_name, calibrate=False)
+            except Exception as e:
+                errors[label] = e
+
+        def calibrate_one(label, engine):
+            try:
+                engine.calibrate(lambda message: None)
+            except Exception as e:
+                errors[label] = e
+
+        threads = [threading.Thread(target=calibrate_one, args=item, name=f"calibrate-{item[0]}")
+                   for item in self.engines.items() if item[0] not in errors]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for label, error in errors.items():
+            print(f"Source {label} unavailable: {error}")
+            del self.engines[label]
+        if not self.engines:
+            raise RuntimeError("No audio source could be opened")
+        metrics.start_http_server()
+
+    def start(self):
+        self.running = True
+        for label, engine in self.engines.items():
+            session = SourceSession(self.logs_dir, label, self.profile_name)
+            archive = engine.open_archive(session.start_time)
+            if archive:
+                session.header["audio_archive"] = archive
+            self.sessions[label] = session
+            engine.start()
+        if PROFILES[self.profile_name]["mode"] == "realtime":
+            threading.Thread(target=self._finalize_loop, name="finalizer", daemon=True).start()
+        print(f"Listening on {len(self.engines)} sources ({', '.join(self.engines)}); Ctrl+C to stop")
+
+    def _finalize_loop(self):
+        while self.running:
+            for engine in self.engines.values():
+                engine.finalize_due_phrase()
+            time.sleep(0.05)
+
+    def stop(self):
+        from rate_limiter import limiter_for
+
+        self.running = False
+        for label, engine in self.engines.items():
+            engine.stop()
+            print(f"{label}: {engine.microphone.stats_summary()}")
+            print(f"{label}: {engine.speaker_turns.stats_summary()}")
+            print(f"{label}: {engine.speech_filter.stats_summary()}")
+            print(f"{label}: {engine.overload.stats_summary()}")
+        print(self.encoder.stats_summary())
+        print(self.pool.stats_summary())
+        print(limiter_for(None).stats_summary())
+        for label, session in self.sessions.items():
+            session.header.update(self.engines[label].clock.header())
+            session.save()
+
+    def run(self):
+        self.initialize()
+        self.start()
+        try:
+            while True:
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            print()
+        finally:
+            self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe several audio inputs at once")
+    parser.add_argument("sources", nargs="*", metavar="LABEL=DEVICE",
+                        help="input device index or part of its name, optionally labelled")
+    parser.add_argument("--preset", default="fast", choices=list(PROFILES), help="profile for every source")
+    parser.add_argument("--workers", type=int, default=4, help="shared recognition workers (default 4)")
+    parser.add_argument("--archive-audio", action="store_true", help="keep each source's captured audio")
+    parser.add_argument("--list-devices", action="store_true", help="print input devices and exit")
+    args = parser.parse_args(argv)
+
+    names = sr.Microphone.list_microphone_names()
+    if args.list_devices or not args.sources:
+        for index, name in enumerate(names):
+            print(f"{index:>3}  {name}")
+        return
+
+    sources = []
+    for spec in args.sources:
+        label, device = parse_source(spec)
+        try:
+            sources.append((label, resolve_device(device, names)))
+        except ValueError as e:
+            parser.error(str(e))
+    if len({label for label, _ in sources}) != len(sources):
+        parser.error("source labels must be unique")
+
+    MultiSourceTranscriber(sources, args.preset, args.workers, archive_audio=args.archive_audio).run()
+
+
+if __name__ == "__main__":
+    main()
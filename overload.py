@@ -0,0 +1,107 @@
+"""
+Overload Control for Speech Transcriber
+Steps recognition down through cheaper modes when it cannot keep up, so
+live latency stays bounded instead of growing with the backlog
+"""
+
+import threading
+import time
+
+import metrics
+
+# Degradation stages, in the order they are entered
+NORMAL = 0
+MERGE = 1         # merge phrases into fewer requests
+LOCAL = 2         # recognize with the local model instead of the service
+LONG_WINDOWS = 3  # longer windows and merged requests, fewer requests overall
+SHED = 4          # stop recognizing; archived audio is left for re-transcription
+
+# Profile window and merged-request lengths are multiplied by this in LONG_WINDOWS
+LONG_WINDOW_SCALE = 2.0
+
+STAGE_NAMES = ("normal", "merge", "local", "long_windows", "shed")
+STAGE_STATUS = (
+    None,
+    "Overloaded: merging phrases",
+    "Overloaded: using local recognition",
+    "Overloaded: using longer windows",
+    "Overloaded: skipping recognition",
+)
+
+
+class OverloadController:
+    """Chooses the degradation stage from the live queue's age and backlog
+
+    ``update`` is fed the age of the oldest queued live recognition job and
+    the number of captures waiting anywhere in the pipeline. When the age
+    passes ``escalate_fraction`` of the latency SLO, or the backlog passes
+    ``max_backlog``, the controller moves one stage down the list, at most
+    once every ``escalate_seconds`` so each step has time to take effect.
+    It moves back one stage at a time once the age has stayed under
+    ``calm_fraction`` of the SLO and the backlog has mostly drained for
+    ``hold_seconds``. Stages that are not ``available`` (no local model, or
+    nothing to change in the current mode) are skipped. ``on_change(stage)`` is called on every transition.
+    """
+
+    def __init__(self, slo_seconds=5.0, max_backlog=8, escalate_fraction=0.5, calm_fraction=0.2,
+                 escalate_seconds=2.0, hold_seconds=10.0, source=None):
+        self.slo_seconds = slo_seconds
+        self.max_backlog = max_backlog
+        self.escalate_fraction = escalate_fraction
+        self.calm_fraction = calm_fraction
+        self.escalate_seconds = escalate_seconds
+        self.hold_seconds = hold_seconds
+        self.available = set(range(len(STAGE_NAMES)))
+        self.on_change = lambda stage: None
+
+        self.lock = threading.Lock()
+        self.stage = NORMAL
+        self.changed_at = time.monotonic()
+        self.calm_since = None
+        self.transitions = 0
+        self.stage_gauge = metrics.OVERLOAD_STAGE.labels(source=source or "default")
+
+    @property
+    def shedding(self):
+        return self.stage == SHED
+
+    def update(self, queue_age, backlog, now=None):
+        """Re-evaluate the stage; returns the current one"""
+        now = now if now is not None else time.monotonic()
+        with self.lock:
+            overloaded = queue_age > self.escalate_fraction * self.slo_seconds or backlog > self.max_backlog
+            calm = queue_age < self.calm_fraction * self.slo_seconds and backlog <= self.max_backlog // 4
+            self.calm_since = (self.calm_since or now) if calm else None
+
+            stage = self.stage
+            if overloaded and now - self.changed_at >= self.escalate_seconds:
+                stage = self._next(self.stage, 1)
+            elif calm and now - max(self.calm_since, self.changed_at) >= self.hold_seconds:
+                stage = self._next(self.stage, -1)
+            if stage == self.stage:
+                return stage
+            self.stage = stage
+            self.changed_at = now
+            self.transitions += 1
+            self.stage_gauge.set(stage)
+        metrics.OVERLOAD_TRANSITIONS.labels(stage=STAGE_NAMES[stage]).inc()
+        self.on_change(stage)
+        return stage
+
+    def _next(self, stage, direction):
+        candidate = stage + direction
+        while NORMAL < candidate < SHED and candidate not in self.available:
+            candidate += direction
+        return min(max(candidate, NORMAL), SHED)
+
+    def reset(self):
+        with self.lock:
+            previous, self.stage = self.stage, NORMAL
+            self.changed_at = time.monotonic()
+            self.calm_since = None
+            self.stage_gauge.set(NORMAL)
+        if previous != NORMAL:
+            self.on_change(NORMAL)
+
+    def stats_summary(self):
+        return f"Overload: {self.transitions} stage changes, now {STAGE_NAMES[self.stage]}"
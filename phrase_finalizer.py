@@ -0,0 +1,181 @@
+"""
+Phrase Finalization for Speech Transcriber
+Commits buffered real-time text based on pause length, recognizer
+confidence and a latency budget instead of word counts
+"""
+
+import audioop
+import bisect
+import threading
+import time
+
+import metrics
+
+
+_VAD_TRANSITIONS = {
+    True: metrics.VAD_EVENTS.labels(event="speech_start"),
+    False: metrics.VAD_EVENTS.labels(event="speech_end"),
+}
+
+
+class PhraseFinalizer:
+    """Decides when the buffered real-time phrase should become final
+
+    A phrase is committed when the speaker has been silent for
+    ``pause_target`` seconds, sooner (``confident_pause``) when the
+    recognizer is confident about the text, and unconditionally once the
+    oldest buffered result is ``max_latency`` seconds old.
+    """
+
+    TERMINAL_PUNCTUATION = ('.', '!', '?', ':', ';')
+
+    def __init__(self, pause_target=1.0, confident_pause=0.5, confidence_target=0.85, max_latency=4.0):
+        self.pause_target = pause_target
+        self.confident_pause = confident_pause
+        self.confidence_target = confidence_target
+        self.max_latency = max_latency
+
+        self.lock = threading.Lock()
+        self.last_voice_time = 0.0
+        self.pending_recognitions = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the current phrase (called after it has been committed)"""
+        with self.lock:
+            self.first_result_time = None
+            self.min_confidence = 1.0
+            self.ends_sentence = False
+
+    def voice_activity(self, voiced, now=None):
+        """Record whether the latest audio frame contained speech"""
+        if voiced:
+            self.last_voice_time = now if now is not None else time.time()
+
+    def recognition_started(self):
+        with self.lock:
+            self.pending_recognitions += 1
+
+    def recognition_finished(self):
+        with self.lock:
+            self.pending_recognitions = max(0, self.pending_recognitions - 1)
+
+    def add_result(self, text, confidence, now=None):
+        """Register a recognized fragment that was appended to the phrase"""
+        now = now if now is not None else time.time()
+        with self.lock:
+            if self.first_result_time is None:
+                self.first_result_time = now
+            self.min_confidence = min(self.min_confidence, confidence)
+            self.ends_sentence = text.strip().endswith(self.TERMINAL_PUNCTUATION)
+
+    def should_finalize(self, now=None):
+        """Return the reason to commit the phrase now, or None to keep waiting"""
+        now = now if now is not None else time.time()
+        with self.lock:
+            if self.first_result_time is None:
+                return None
+
+            # Hard bound on how long text may sit in the real-time area
+            if now - self.first_result_time >= self.max_latency:
+                return "latency"
+
+            # More audio of this phrase is still being recognized
+            if self.pending_recognitions:
+                return None
+
+            pause = now - self.last_voice_time
+            if self.ends_sentence:
+                return "punctuation"
+            if pause >= self.pause_target:
+                return "pause"
+            if self.min_confidence >= self.confidence_target and pause >= self.confident_pause:
+                return "confidence"
+            return None
+
+
+class PhraseState:
+    """The real-time phrase being built, shared by recognition workers and the finalize loop
+
+    Segments are kept in a list in capture order (parallel workers can
+    finish out of order), so adding one is an append and the text is only
+    joined when it is rendered. Every change holds one lock and updates the
+    finalizer under it: taking the phrase for finalization and resetting the
+    finalizer are a single step, and nothing recognized in between is lost
+    or rendered twice.
+    """
+
+    def __init__(self, finalizer):
+        self.finalizer = finalizer
+        self.lock = threading.Lock()
+        self.segments = []  # (trace id, text, trace)
+
+    def append(self, text, trace, confidence):
+        """Add a recognized segment; returns (phrase ended by a speaker change or None, rendered text)"""
+        with self.lock:
+            ended = None
+            if self.segments and self.segments[-1][2].speaker_turn != trace.speaker_turn:
+                ended = self._take()
+            segment = (trace.trace_id, text, trace)
+            if not self.segments or trace.trace_id >= self.segments[-1][0]:
+                self.segments.append(segment)
+            else:
+                index = bisect.bisect([trace_id for trace_id, _, _ in self.segments], trace.trace_id)
+                self.segments.insert(index, segment)
+            self.finalizer.add_result(text, confidence)
+            return ended, self._render()
+
+    def render(self, pending=None):
+        """The phrase text, optionally followed by ``pending`` text not yet added"""
+        with self.lock:
+            return self._render(pending)
+
+    def take(self):
+        """Return (text, traces) of the phrase and start a new one"""
+        with self.lock:
+            return self._take()
+
+    def clear(self):
+        with self.lock:
+            self._take()
+
+    def _render(self, pending=None):
+        texts = [text for _, text, _ in self.segments]
+        if pending:
+            texts.append(pending)
+        return " ".join(texts)
+
+    def _take(self):
+        phrase = self._render(), [trace for _, _, trace in self.segments]
+        self.segments = []
+        self.finalizer.reset()
+        return phrase
+
+
+class VoiceActivityTap:
+    """Wraps a microphone stream and reports voiced frames to a finalizer
+
+    ``Recognizer.listen`` owns the read loop, so tapping the stream is the
+    only way to see pauses as they happen rather than after the phrase ends.
+    """
+
+    def __init__(self, stream, sample_width, recognizer, finalizer):
+        self.stream = stream
+        self.sample_width = sample_width
+        self.recognizer = recognizer
+        self.finalizer = finalizer
+        self.voiced = False
+
+    def read(self, size):
+        buffer = self.stream.read(size)
+        if buffer:
+            energy = audioop.rms(buffer, self.sample_width)
+            voiced = energy > self.recognizer.energy_threshold
+            if voiced != self.voiced:
+                self.voiced = voiced
+                _VAD_TRANSITIONS[voiced].inc()
+            self.finalizer.voice_activity(voiced)
+        return buffer
+
+    def close(self):
+        self.stream.close()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Pool Benchmark for Speech Transcriber
+Keeps a recognition pool saturated with background batch jobs while live
+finals arrive, and reports how long the finals wait compared with an idle
+pool
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from recognition_pool import BATCH, FINAL, RecognitionPool
+
+
+class StandIn:
+    """Recognition stand-in: every request takes ``latency`` seconds
+
+    Counts the batch requests running at once, so the benchmark can check
+    them against the pool's batch limit.
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.batch_running = 0
+        self.batch_peak = 0
+
+    def final(self):
+        time.sleep(self.latency)
+
+    def batch(self):
+        with self.lock:
+            self.batch_running += 1
+            self.batch_peak = max(self.batch_peak, self.batch_running)
+        time.sleep(self.latency)
+        with self.lock:
+            self.batch_running -= 1
+
+
+def final_waits(pool, standin, finals, gap):
+    """Seconds each of ``finals`` finals, one every ``gap`` seconds, waited to start"""
+    waits = []
+    for _ in range(finals):
+        queued = time.perf_counter()
+        started = pool.submit("live", lambda: time.perf_counter() - queued)
+        waits.append(started.result())
+        pool.submit("live", standin.final)
+        time.sleep(gap)
+    return waits
+
+
+def overtakes(workers):
+    """True if a final queued behind batch jobs starts before every one of them"""
+    pool = RecognitionPool(workers, name="overtake")
+    order = []
+    gate = threading.Event()
+    # Occupy every worker, then queue batch jobs and a final behind them
+    for _ in range(workers):
+        pool.submit("live", gate.wait)
+    batch = [pool.submit("batch", order.append, BATCH, priority=BATCH) for _ in range(workers * 4)]
+    final = pool.submit("live", order.append, FINAL)
+    gate.set()
+    final.result()
+    for future in batch:
+        future.result()
+    return order[0] == FINAL
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Final-request waits while batch work saturates a recognition pool")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per stand-in request")
+    parser.add_argument("--finals", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=400, help="batch jobs queued up front")
+    args = parser.parse_args()
+
+    print(f"=== Pool Benchmark ({args.workers} workers, {args.latency * 1000:.0f} ms per request) ===")
+    print()
+    print(f"{'Pool':<24}{'Final wait p50':>16}{'max':>10}")
+    results = {}
+    for name, batch_jobs in (("idle", 0), ("saturated by batch", args.batch)):
+        pool = RecognitionPool(args.workers, name=name.split()[0])
+        standin = StandIn(args.latency)
+        for _ in range(batch_jobs):
+            pool.submit("retranscribe", standin.batch, priority=BATCH)
+        waits = final_waits(pool, standin, args.finals, args.latency)
+        results[name] = (pool, standin)
+        print(f"{name:<24}{statistics.median(waits) * 1000:>14.1f}ms{max(waits) * 1000:>8.1f}ms")
+
+    pool, standin = results["saturated by batch"]
+    print()
+    failures = []
+    if standin.batch_peak > pool.limits[BATCH]:
+        failures.append(f"batch ran on {standin.batch_peak} workers, over its limit of {pool.limits[BATCH]}")
+    else:
+        print(f"✓ Batch ran on at most {standin.batch_peak} of {args.workers} workers "
+              f"(limit {pool.limits[BATCH]})")
+    if not overtakes(args.workers):
+        failures.append("a final queued behind batch jobs did not start first")
+    else:
+        print("✓ A final queued behind batch jobs starts before them")
+    for failure in failures:
+        print(f"✗ {failure}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
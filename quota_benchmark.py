@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Quota Benchmark for Speech Transcriber
+Sends bursts of recognition requests through the client-side rate limiter
+to a local stand-in service that enforces a quota, and reports how many
+get through and how many are throttled
+"""
+
+import argparse
+import threading
+import time
+
+import speech_recognition as sr
+
+from rate_limiter import RateLimiter
+
+
+class QuotaStandIn:
+    """Local stand-in for the recognition service
+
+    Accepts ``rate`` requests per second with bursts of up to ``burst`` and
+    refuses the rest the way the real service does: an HTTP 429, which
+    ``recognize_google`` raises as a RequestError. Each accepted request
+    takes ``latency`` seconds.
+    """
+
+    def __init__(self, rate, burst, latency=0.05):
+        self.rate = rate
+        self.burst = burst
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.refilled = time.monotonic()
+        self.accepted = 0
+        self.refused = 0
+
+    def recognize(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+            self.refilled = now
+            if self.tokens < 1.0:
+                self.refused += 1
+                raise sr.RequestError("recognition request failed: Too Many Requests")
+            self.tokens -= 1.0
+            self.accepted += 1
+        time.sleep(self.latency)
+        return "stand-in transcript"
+
+
+def run(standin, limiter, clients=8, seconds=20.0, burst=6, gap=1.0):
+    """``clients`` threads each send ``burst`` requests back to back every ``gap`` seconds"""
+    started = time.monotonic()
+    stop_at = started + seconds
+
+    def client():
+        while time.monotonic() < stop_at:
+            for _ in range(burst):
+                if time.monotonic() >= stop_at:
+                    break
+                try:
+                    if limiter is None:
+                        standin.recognize()
+                    else:
+                        with limiter.request():
+                            standin.recognize()
+                except sr.RequestError:
+                    pass
+            time.sleep(gap)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return standin.accepted / (time.monotonic() - started), standin.refused
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limiter against a local quota-enforcing stand-in")
+    parser.add_argument("--quota", type=float, default=5.0, help="requests per second the stand-in accepts")
+    parser.add_argument("--burst", type=int, default=5, help="stand-in burst allowance")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--clients", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"Stand-in quota: {args.quota:.1f}/s, burst {args.burst}; {args.clients} bursty clients")
+    print(f"{'Client':<28} {'Accepted/s':>10} {'Throttled':>10}")
+    setups = [
+        ("no limiter", None),
+        ("limiter at the quota", RateLimiter(args.quota, args.burst)),
+        ("limiter at 2x the quota", RateLimiter(args.quota * 2, args.burst * 2, probe_seconds=args.seconds)),
+    ]
+    for name, limiter in setups:
+        throughput, refused = run(QuotaStandIn(args.quota, args.burst), limiter, args.clients, args.seconds)
+        print(f"{name:<28} {throughput:>10.2f} {refused:>10}")
+        if limiter is not None:
+            print(f"  {limiter.stats_summary()}")
+
+
+if __name__ == "__main__":
+    main()
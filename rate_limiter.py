@@ -0,0 +1,173 @@
+"""
+Rate Limiter for Speech Transcriber
+Client-side token buckets that keep recognition requests within each API
+key's quota and back off when the service starts throttling
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import speech_recognition as sr
+
+import metrics
+
+# Requests per second and burst size by API key; None is speech_recognition's
+# shared default key, whose limits are undocumented, so it starts cautious
+# and adapts to what the service accepts
+QUOTAS = {
+    None: (4.0, 8),
+}
+DEFAULT_QUOTA = (10.0, 20)
+# Share of a key's quota kept for background re-transcription; the live
+# limiter paces itself to the rest, so the two together stay within the
+# quota even when they run in separate processes
+BATCH_SHARE = 0.25
+
+THROTTLING_MARKERS = ("too many requests", "429", "quota", "rate limit", "ratelimit")
+
+
+def is_throttling(error):
+    """True if a RequestError is the service refusing us for sending too much"""
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLING_MARKERS)
+
+
+class RateLimiter:
+    """Token bucket for one API key, adapting its rate to throttling
+
+    Requests take one token each; tokens refill at ``rate`` per second up to
+    ``burst``. A throttling response halves the rate, caps the rate's
+    ceiling just under the rate that tripped the limit, and blocks all
+    requests for a backoff period that doubles while the throttling goes on;
+    requests already in flight when that happened do not count again. Every
+    accepted request then raises the rate a step back towards that ceiling,
+    and a ceiling that has held for ``probe_seconds`` is raised again
+    towards the configured quota, so the limiter settles right under the
+    limit the service actually enforces.
+    """
+
+    def __init__(self, rate, burst, min_rate=0.25, step=0.05, backoff=1.0, max_backoff=30.0,
+                 probe_seconds=60.0):
+        self.quota = rate
+        self.ceiling = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.step = step
+        self.initial_backoff = backoff
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.probe_seconds = probe_seconds
+
+        self.condition = threading.Condition()
+        self.tokens = float(burst)
+        self.refilled = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_throttled = 0.0
+        self.accepted = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+
+    def available(self):
+        """True if a request could be sent right now"""
+        with self.condition:
+            now = time.monotonic()
+            self._refill(now)
+            return now >= self.blocked_until and self.tokens >= 1.0
+
+    def acquire(self, timeout=None):
+        """Wait for a token; returns False if ``timeout`` passes first"""
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    self.wait_seconds += now - started
+                    return True
+                delay = max(self.blocked_until - now, (1.0 - self.tokens) / self.rate)
+                if deadline is not None:
+                    if now >= deadline:
+                        return False
+                    delay = min(delay, deadline - now)
+                self.condition.wait(delay)
+
+    def on_accepted(self):
+        with self.condition:
+            self.accepted += 1
+            self.backoff = self.initial_backoff
+            now = time.monotonic()
+            if self.ceiling < self.quota and now - self.last_throttled >= self.probe_seconds:
+                # The limit may have been temporary; probe a little higher
+                self.ceiling = min(self.quota, self.ceiling * (1 + self.step))
+                self.last_throttled = now
+            self.rate = min(self.ceiling, self.rate + self.step * self.ceiling)
+
+    def on_throttled(self, sent_at):
+        with self.condition:
+            self.throttled += 1
+            if sent_at < self.last_throttled:
+                return  # part of a burst that has already been answered
+            now = time.monotonic()
+            self.ceiling = max(self.min_rate, min(self.ceiling, self.rate * 0.9))
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.blocked_until = now + self.backoff
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            self.last_throttled = now
+
+    @contextmanager
+    def request(self):
+        """Hold one request slot; the outcome of the block adjusts the rate"""
+        self.acquire()
+        sent_at = time.monotonic()
+        try:
+            yield
+        except sr.RequestError as e:
+            if is_throttling(e):
+                metrics.RECOGNITION_THROTTLED.inc()
+                self.on_throttled(sent_at)
+            raise
+        except sr.UnknownValueError:
+            self.on_accepted()  # the service answered, there was just no speech
+            raise
+        else:
+            self.on_accepted()
+
+    def stats_summary(self):
+        with self.condition:
+            requests = self.accepted + self.throttled
+            wait_ms = self.wait_seconds / requests * 1000 if requests else 0.0
+            return (f"Rate limiter: {self.accepted} accepted, {self.throttled} throttled, "
+                    f"now {self.rate:.1f}/s (ceiling {self.ceiling:.1f}, quota {self.quota:.1f}), "
+                    f"avg wait {wait_ms:.0f} ms")
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(key=None, batch=False):
+    """The process-wide limiter of an API key, shared by every engine using it
+
+    Limiters only see the requests of their own process. The live one is
+    paced at the quota less ``BATCH_SHARE`` and, with ``batch``, the
+    background re-transcription one at ``BATCH_SHARE``, so a re-transcription
+    run, in this process or another, cannot crowd out live recognition.
+    """
+    with _limiters_lock:
+        if (key, batch) not in _limiters:
+            rate, burst = QUOTAS.get(key, DEFAULT_QUOTA)
+            share = BATCH_SHARE if batch else 1.0 - BATCH_SHARE
+            rate, burst = rate * share, max(int(burst * share), 1)
+            limiter = _limiters[key, batch] = RateLimiter(rate, burst)
+            if key is None and not batch:
+                metrics.RATE_LIMIT.set_function(lambda: limiter.rate)
+        return _limiters[key, batch]
@@ -0,0 +1,187 @@
+"""
+Recognition Pool for Speech Transcriber
+A fixed set of recognition workers shared by every audio source. Work is
+served by priority class (live finals first, background batch last) and,
+within a class, round-robin across sources so a busy source cannot starve
+a quiet one
+"""
+
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+import metrics
+
+# Priority classes, most urgent first
+FINAL = "final"      # text that becomes a transcription entry
+PARTIAL = "partial"  # real-time hypotheses and speculative requests
+RETRY = "retry"      # requests sent again after a failure
+BATCH = "batch"      # background re-transcription
+PRIORITIES = (FINAL, PARTIAL, RETRY, BATCH)
+
+
+class RecognitionPool:
+    """Worker threads running recognition jobs by priority, fairly across sources
+
+    A free worker takes the oldest job of the most urgent class that is
+    under its concurrency limit, so a newly queued final goes ahead of all
+    queued partials, retries and batch work. Running jobs are never
+    interrupted; instead the lower classes are capped (``limits``) and,
+    together, may not occupy the last ``reserved`` workers, which keeps a
+    worker free for the next final even while background jobs saturate the
+    pool.
+
+    Within a class each source has its own FIFO queue, served round-robin:
+    with N busy sources each one gets every N-th job of that class no matter
+    how many jobs it has queued. ``submit`` returns a
+    ``concurrent.futures.Future``.
+    """
+
+    def __init__(self, workers=4, name="recognizer", limits=None, reserved=1):
+        self.workers = workers
+        self.reserved = min(reserved, workers - 1)
+        self.limits = {
+            FINAL: workers,
+            PARTIAL: max(workers - 1, 1),
+            RETRY: max(workers // 2, 1),
+            BATCH: max(workers // 4, 1),
+        }
+        self.limits.update(limits or {})
+
+        self.condition = threading.Condition()
+        self.queues = {priority: {} for priority in PRIORITIES}  # priority -> source -> deque of jobs
+        self.ready = {priority: collections.deque() for priority in PRIORITIES}  # sources in serving order
+        self.running = dict.fromkeys(PRIORITIES, 0)
+        self.source_stats = {}
+        self.priority_stats = {priority: {"jobs": 0, "wait_seconds": 0.0} for priority in PRIORITIES}
+
+        for index in range(workers):
+            threading.Thread(target=self._run, name=f"{name}-{index}", daemon=True).start()
+        metrics.QUEUE_DEPTH.labels(queue="recognition").set_function(self.qsize)
+        for priority in PRIORITIES:
+            metrics.QUEUE_DEPTH.labels(queue=f"recognition_{priority}").set_function(
+                lambda priority=priority: self.qsize(priority))
+
+    def submit(self, source, fn, *args, priority=FINAL, **kwargs):
+        """Queue ``fn(*args, **kwargs)`` on behalf of ``source`` in class ``priority``"""
+        future = Future()
+        with self.condition:
+            queues = self.queues[priority]
+            jobs = queues.setdefault(source, collections.deque())
+            if not jobs:
+                self.ready[priority].append(source)
+            jobs.append((future, fn, args, kwargs, time.perf_counter()))
+            self.condition.notify()
+        return future
+
+    def cancel(self, future):
+        """Withdraw a job that has not started; returns False once it is running or done"""
+        with self.condition:
+            if not future.cancel():
+                return False
+            for priority, queues in self.queues.items():
+                for source, jobs in queues.items():
+                    for job in jobs:
+                        if job[0] is future:
+                            jobs.remove(job)
+                            if not jobs:
+                                self.ready[priority].remove(source)
+                            return True
+        return True
+
+    def executor(self, source, priority=FINAL):
+        """An executor-like view whose ``submit(fn, *args)`` queues for ``source``"""
+        return _SourceExecutor(self, source, priority)
+
+    def qsize(self, priority=None):
+        with self.condition:
+            priorities = PRIORITIES if priority is None else (priority,)
+            return sum(len(jobs) for p in priorities for jobs in self.queues[p].values())
+
+    def oldest_age(self, priorities=PRIORITIES):
+        """Seconds the oldest queued job of ``priorities`` has been waiting"""
+        now = time.perf_counter()
+        with self.condition:
+            queued = [jobs[0][4] for p in priorities for jobs in self.queues[p].values() if jobs]
+        return now - min(queued) if queued else 0.0
+
+    def _startable(self, priority):
+        if self.running[priority] >= self.limits[priority]:
+            return False
+        if priority == FINAL:
+            return True
+        background = sum(count for p, count in self.running.items() if p != FINAL)
+        return background < self.workers - self.reserved
+
+    def _next_job(self):
+        with self.condition:
+            while True:
+                for priority in PRIORITIES:
+                    if self.ready[priority] and self._startable(priority):
+                        ready = self.ready[priority]
+                        source = ready.popleft()
+                        jobs = self.queues[priority][source]
+                        job = jobs.popleft()
+                        if jobs:
+                            ready.append(source)
+                        self.running[priority] += 1
+                        return priority, source, job
+                self.condition.wait()
+
+    def _run(self):
+        while True:
+            priority, source, (future, fn, args, kwargs, queued_at) = self._next_job()
+            started = time.perf_counter()
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = fn(*args, **kwargs)
+                    except BaseException as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                with self.condition:
+                    self.running[priority] -= 1
+                    # A capped class may have work waiting for this slot
+                    self.condition.notify_all()
+            if not future.cancelled():
+                self._record(priority, source, started - queued_at, time.perf_counter() - started)
+
+    def _record(self, priority, source, wait_seconds, busy_seconds):
+        with self.condition:
+            stats = self.source_stats.setdefault(source, {"jobs": 0, "wait_seconds": 0.0, "busy_seconds": 0.0})
+            stats["jobs"] += 1
+            stats["wait_seconds"] += wait_seconds
+            stats["busy_seconds"] += busy_seconds
+            stats = self.priority_stats[priority]
+            stats["jobs"] += 1
+            stats["wait_seconds"] += wait_seconds
+
+    def stats(self):
+        with self.condition:
+            return {source: dict(stats) for source, stats in self.source_stats.items()}
+
+    def stats_summary(self):
+        parts = []
+        for source, stats in self.stats().items():
+            wait_ms = stats["wait_seconds"] / stats["jobs"] * 1000
+            parts.append(f"{source or 'default'} {stats['jobs']} jobs, avg wait {wait_ms:.0f} ms")
+        with self.condition:
+            classes = [f"{priority} {stats['wait_seconds'] / stats['jobs'] * 1000:.0f} ms"
+                       for priority, stats in self.priority_stats.items() if stats["jobs"]]
+        summary = f"Recognition pool ({self.workers} workers): " + ("; ".join(parts) if parts else "no jobs")
+        if classes:
+            summary += f" (avg wait by class: {', '.join(classes)})"
+        return summary
+
+
+class _SourceExecutor:
+    def __init__(self, pool, source, priority):
+        self.pool = pool
+        self.source = source
+        self.priority = priority
+
+    def submit(self, fn, *args, **kwargs):
+        return self.pool.submit(self.source, fn, *args, priority=self.priority, **kwargs)
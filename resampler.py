@@ -0,0 +1,120 @@
+"""
+Capture Resampler for Speech Transcriber
+Converts the microphone stream to the recognition format (16 kHz 16-bit
+by default) as it is read, so every later stage handles less audio
+"""
+
+import audioop
+import math
+from contextlib import contextmanager
+
+# Low-pass cutoff before lowering the rate, as a fraction of the new rate
+# (just under its Nyquist frequency of 0.5)
+CUTOFF_FRACTION = 0.44
+
+
+def lowpass_taps(cutoff, count=47):
+    """Hamming-windowed sinc low-pass, ``cutoff`` a fraction of the sample rate; unity gain"""
+    middle = (count - 1) / 2
+    taps = []
+    for n in range(count):
+        x = n - middle
+        sinc = 2 * cutoff if x == 0 else math.sin(2 * math.pi * cutoff * x) / (math.pi * x)
+        taps.append(sinc * (0.54 - 0.46 * math.cos(2 * math.pi * n / (count - 1))))
+    total = sum(taps)
+    return [tap / total for tap in taps]
+
+
+class LowPassFilter:
+    """FIR low-pass over PCM chunks, keeping the last input samples between calls
+
+    Each tap is one ``audioop.mul`` and ``audioop.add`` pass over the chunk,
+    summed at 32 bits (at half scale, so the sum cannot saturate before the
+    output does), so the filter costs a few C loops per tap rather than a
+    Python loop per sample.
+    """
+
+    def __init__(self, cutoff, width, count=47):
+        self.taps = [tap / 2 for tap in lowpass_taps(cutoff, count)]
+        self.width = width
+        self.history = b"\0" * 4 * (count - 1)
+
+    def filter(self, data):
+        wide = self.history + audioop.lin2lin(data, self.width, 4)
+        size = len(wide) - len(self.history)
+        total = None
+        # The taps are symmetric, so offsets need not be reversed
+        for index, tap in enumerate(self.taps):
+            term = audioop.mul(wide[index * 4:index * 4 + size], 4, tap)
+            total = term if total is None else audioop.add(total, term, 4)
+        self.history = wide[size:]
+        return audioop.lin2lin(audioop.mul(total, 4, 2), 4, self.width)
+
+
+class ResamplingStream:
+    """Stream wrapper returning audio in the target format
+
+    ``read(size)`` takes ``size`` in target frames and reads the matching
+    number of native frames. ``audioop.ratecv`` only interpolates, so when
+    the rate goes down the audio is first low-pass filtered below the new
+    Nyquist frequency; otherwise everything above it (8 kHz for 16 kHz)
+    would alias into the speech band. The filter's and the rate converter's
+    state are kept between reads, so chunk boundaries leave no clicks or
+    drift.
+    """
+
+    def __init__(self, stream, native_rate, native_width, rate, width):
+        self.stream = stream
+        self.native_rate = native_rate
+        self.native_width = native_width
+        self.rate = rate
+        self.width = width
+        self.state = None
+        self.lowpass = LowPassFilter(CUTOFF_FRACTION * rate / native_rate, width) if rate < native_rate else None
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def read(self, size):
+        frames = max(int(round(size * self.native_rate / self.rate)), 1)
+        data = self.stream.read(frames)
+        if not data:
+            return data
+        self.bytes_in += len(data)
+        if self.native_width != self.width:
+            data = audioop.lin2lin(data, self.native_width, self.width)
+        if self.lowpass is not None:
+            data = self.lowpass.filter(data)
+        if self.native_rate != self.rate:
+            data, self.state = audioop.ratecv(data, self.width, 1, self.native_rate, self.rate, self.state)
+        self.bytes_out += len(data)
+        return data
+
+    def close(self):
+        self.stream.close()
+
+
+@contextmanager
+def resampled(source, rate=16000, width=2):
+    """Enter ``source`` and read it as ``rate`` Hz ``width``-byte audio
+
+    The device is opened mono, so there is no downmix. ``rate=None`` keeps
+    the native rate. The source's SAMPLE_RATE,
+    SAMPLE_WIDTH and CHUNK describe the converted stream inside the block
+    (``Recognizer.listen`` times its reads from them) and are restored on
+    exit, so the device is reopened at its own rate next time.
+    """
+    with source:
+        native = (source.SAMPLE_RATE, source.SAMPLE_WIDTH, source.CHUNK)
+        rate = rate or source.SAMPLE_RATE
+        if (source.SAMPLE_RATE, source.SAMPLE_WIDTH) == (rate, width):
+            yield source
+            return
+
+        source.stream = ResamplingStream(source.stream, source.SAMPLE_RATE, source.SAMPLE_WIDTH, rate, width)
+        # Keep the same read duration, so listen's timing is unchanged
+        source.CHUNK = max(source.CHUNK * rate // source.SAMPLE_RATE, 1)
+        source.SAMPLE_RATE, source.SAMPLE_WIDTH = rate, width
+        try:
+            yield source
+        finally:
+            source.SAMPLE_RATE, source.SAMPLE_WIDTH, source.CHUNK = native
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Re-transcription Runner for Speech Transcriber
+Runs the archived audio of past sessions through a recognition backend
+again, as background batch work on a recognition pool, and writes the new
+transcript next to each original as ``<session>.<backend>.json``
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextlib import nullcontext
+from datetime import datetime
+
+from audio_archive import AudioArchiveReader
+from recognition_pool import BATCH, RecognitionPool
+
+CHECKPOINT_FILE = "retranscribe_checkpoint.json"
+MIN_GAP_SECONDS = 0.5  # archived audio between entries shorter than this is not retried
+THROTTLED_ATTEMPTS = 5  # a segment refused this many times for throttling fails until the next run
+
+
+def _recognize_segment(pcm, sample_rate, sample_width, backend, language, limiter=None):
+    """Runs on a pool worker; returns the recognized text ("" for no speech)
+
+    Every request waits for ``limiter``. A throttled request is sent again
+    once the limiter's backoff is over instead of failing the segment.
+    """
+    import speech_recognition as sr
+    from rate_limiter import is_throttling
+
+    recognizer = sr.Recognizer()
+    audio = sr.AudioData(pcm, sample_rate, sample_width)
+    recognize = getattr(recognizer, f"recognize_{backend}")
+    for attempt in range(THROTTLED_ATTEMPTS):
+        try:
+            with limiter.request() if limiter is not None else nullcontext():
+                return recognize(audio, language=language)
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError as e:
+            if not is_throttling(e) or attempt == THROTTLED_ATTEMPTS - 1:
+                raise
+
+
+class Segment:
+    """One span of archived audio to recognize"""
+
+    def __init__(self, offset, duration, entry=None):
+        self.offset = offset
+        self.duration = duration
+        self.entry = entry  # the original transcription, or None for unrecognized audio
+        self.content_hash = None
+        self.text = None
+
+
+def session_segments(session, reader, include_gaps=True):
+    """Segments for every linked entry, plus archived audio no entry covers"""
+    segments = [Segment(entry["audio_offset"], entry["audio_duration"], entry)
+                for entry in session.get("transcriptions", []) if "audio_offset" in entry]
+    if include_gaps:
+        # Captures that were never transcribed (failed or silent phrases)
+        covered = sorted((segment.offset, segment.offset + segment.duration) for segment in segments)
+        position = 0.0
+        for start, end in covered + [(reader.duration, reader.duration)]:
+            if start - position >= MIN_GAP_SECONDS:
+                segments.append(Segment(position, start - position))
+            position = max(position, end)
+    return sorted(segments, key=lambda segment: segment.offset)
+
+
+class Checkpoint:
+    """Recognized text by segment content hash, saved as the run goes
+
+    The hash covers the audio, the backend and the language, so a segment
+    is only sent again if one of those changed; an interrupted run resumes
+    where it stopped.
+    """
+
+    def __init__(self, path, save_interval=5.0):
+        self.path = path
+        self.save_interval = save_interval
+        self.results = {}
+        self.last_save = time.monotonic()
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.results = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable checkpoint {path}: {e}")
+
+    def add(self, content_hash, text):
+        self.results[content_hash] = text
+        if time.monotonic() - self.last_save >= self.save_interval:
+            self.save()
+
+    def save(self):
+        temporary = self.path + ".tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f)
+        os.replace(temporary, self.path)
+        self.last_save = time.monotonic()
+
+
+def segment_hash(pcm, backend, language):
+    digest = hashlib.sha1(pcm)
+    digest.update(f"\0{backend}\0{language}".encode())
+    return digest.hexdigest()
+
+
+def find_sessions(logs_dir):
+    """Original session logs that have an audio archive"""
+    sessions = []
+    for path in sorted(glob.glob(os.path.join(logs_dir, "transcription_*.json"))):
+        if os.path.basename(path).count(".") > 1:
+            continue  # an earlier re-transcription
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                session = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        if session.get("audio_archive"):
+            sessions.append((path, session))
+    return sessions
+
+
+def write_version(path, session, segments, backend, language):
+    """Write the re-transcribed session next to the original"""
+    version = {key: value for key, value in session.items() if key != "transcriptions"}
+    version["version"] = {
+        "backend": backend,
+        "language": language,
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "original": os.path.basename(path),
+    }
+    transcriptions = []
+    for segment in segments:
+        if not segment.text and segment.entry is None:
+            continue  # still nothing recognizable in this gap
+        record = dict(segment.entry) if segment.entry is not None else {
+            "timestamp": "", "audio_offset": round(segment.offset, 3),
+            "audio_duration": round(segment.duration, 3), "recovered": True,
+        }
+        if segment.entry is not None:
+            record["original_text"] = segment.entry.get("text", "")
+        record["text"] = segment.text or ""
+        record["full_entry"] = f"[{record['timestamp']}] {record['text']}" if record["timestamp"] else record["text"]
+        record["word_count"] = len(record["text"].split())
+        record["segment_hash"] = segment.content_hash
+        transcriptions.append(record)
+    version["transcriptions"] = transcriptions
+    version["total_transcriptions"] = len(transcriptions)
+    version["total_words"] = sum(record["word_count"] for record in transcriptions)
+
+    output = f"{path[:-len('.json')]}.{backend}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(version, f, indent=2, ensure_ascii=False)
+    return output
+
+
+def run(logs_dir="transcription_logs", backend="google", language="en-US", workers=None, include_gaps=True,
+        pool=None):
+    """Re-transcribe every archived session in ``logs_dir``
+
+    Segments are queued in the ``batch`` class of ``pool``, so when it is a
+    live transcriber's pool its finals, partials and retries always go
+    first. Without one the run gets a pool of its own with ``workers``
+    workers, all of which batch work may use.
+    """
+    from rate_limiter import limiter_for
+
+    if pool is None:
+        workers = workers or 4
+        pool = RecognitionPool(workers, name="retranscriber", limits={BATCH: workers}, reserved=0)
+    # recognize_google is called without a key, on the live transcriber's
+    # shared default key, so it is paced to the batch share of that quota
+    limiter = limiter_for(None, batch=True) if backend == "google" else None
+    checkpoint = Checkpoint(os.path.join(logs_dir, CHECKPOINT_FILE))
+    sessions = find_sessions(logs_dir)
+    print(f"=== Re-transcribing {len(sessions)} sessions with '{backend}' "
+          f"on {pool.limits[BATCH]} batch workers ===")
+
+    sent = reused = failed = 0
+    try:
+        for path, session in sessions:
+            try:
+                reader = AudioArchiveReader(os.path.join(logs_dir, session["audio_archive"]))
+            except (OSError, ValueError) as e:
+                print(f"Skipping {os.path.basename(path)}: {e}")
+                continue
+
+            segments = session_segments(session, reader, include_gaps)
+            in_flight = {}
+            session_failed = False
+            for segment in segments:
+                pcm = reader.read(segment.offset, segment.duration)
+                segment.content_hash = segment_hash(pcm, backend, language)
+                if segment.content_hash in checkpoint.results:
+                    segment.text = checkpoint.results[segment.content_hash]
+                    reused += 1
+                    continue
+
+                # Keep a bounded number of segments in memory
+                while len(in_flight) >= pool.limits[BATCH] * 2:
+                    session_failed |= _collect(in_flight, checkpoint)
+                future = pool.submit("retranscribe", _recognize_segment, pcm, reader.sample_rate,
+                                     reader.sample_width, backend, language, limiter, priority=BATCH)
+                in_flight[future] = segment
+                sent += 1
+            while in_flight:
+                session_failed |= _collect(in_flight, checkpoint)
+
+            failed += sum(1 for segment in segments if segment.text is None)
+            checkpoint.save()
+            if session_failed:
+                print(f"  {os.path.basename(path)}: some segments failed; rerun to retry them")
+                continue
+            output = write_version(path, session, segments, backend, language)
+            print(f"  {os.path.basename(path)}: {len(segments)} segments -> {os.path.basename(output)}")
+    finally:
+        # Keep whatever finished before an interruption
+        checkpoint.save()
+
+    print()
+    print(f"Segments recognized: {sent}, reused from checkpoint: {reused}, failed: {failed}")
+    if limiter is not None:
+        print(limiter.stats_summary())
+
+
+def _collect(in_flight, checkpoint):
+    """Record the segments finished so far; returns True if any of them failed"""
+    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+    any_failed = False
+    for future in done:
+        segment = in_flight.pop(future)
+        try:
+            segment.text = future.result()
+        except Exception as e:
+            print(f"  Segment at {segment.offset:.1f} s failed: {e}")
+            any_failed = True
+            continue
+        checkpoint.add(segment.content_hash, segment.text)
+    return any_failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-transcribe archived session audio")
+    parser.add_argument("--logs", default="transcription_logs", help="logs directory (default transcription_logs)")
+    parser.add_argument("--backend", default="google",
+                        help="speech_recognition backend, as in Recognizer.recognize_<backend> (default google)")
+    parser.add_argument("--language", default="en-US")
+    parser.add_argument("--workers", type=int, default=None, help="recognition workers (default 4)")
+    parser.add_argument("--no-gaps", action="store_true",
+                        help="only redo transcribed entries, not archived audio that produced no text")
+    args = parser.parse_args()
+
+    run(args.logs, args.backend, args.language, args.workers, include_gaps=not args.no_gaps)
+
+
+if __name__ == "__main__":
+    main()
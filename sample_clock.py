@@ -0,0 +1,132 @@
+"""
+Sample Clock for Speech Transcriber
+A session timeline counted in captured samples, placing each phrase's
+speech to the millisecond no matter when it was recognized
+"""
+
+import audioop
+import math
+import threading
+import time
+from datetime import datetime
+
+
+class SampleClock:
+    """Position of the capture stream, in seconds of audio since the session started
+
+    Every chunk read advances the clock by its sample count. Audio the
+    microphone dropped while the listener was behind (its cumulative
+    ``dropped_seconds``) is counted as if it had been read, so positions
+    stay on real time. The wall-clock time of position 0, ``anchor``, is
+    taken from the first chunk read after ``reset``.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.anchor = None
+            self.rate = None
+            self.base = 0.0  # seconds counted before the current rate took effect
+            self.samples = 0
+            self.dropped = None
+
+    def _position(self):
+        return self.base + (self.samples / self.rate if self.rate else 0.0)
+
+    def advance(self, samples, rate, dropped_seconds=0.0):
+        """Count ``samples`` read at ``rate``; returns the position of the first one"""
+        with self.lock:
+            if rate != self.rate:
+                self.base = self._position()
+                self.samples = 0
+                self.rate = rate
+            if self.dropped is not None and dropped_seconds > self.dropped:
+                self.samples += int(round((dropped_seconds - self.dropped) * rate))
+            self.dropped = dropped_seconds
+            if self.anchor is None:
+                self.anchor = time.time() - samples / rate
+            position = self._position()
+            self.samples += samples
+            return position
+
+    def position(self):
+        with self.lock:
+            return self._position()
+
+    def wall_time(self, position):
+        """Epoch time of ``position``, or None before the first read"""
+        return self.anchor + position if self.anchor is not None else None
+
+    def header(self):
+        """Session-file fields anchoring the entries' offsets in wall-clock time"""
+        if self.anchor is None:
+            return {}
+        return {"timeline_start": datetime.fromtimestamp(self.anchor).isoformat(sep=" ", timespec="milliseconds")}
+
+
+class ClockTap:
+    """Stream wrapper advancing a SampleClock and noting where speech starts and ends
+
+    Voiced chunks are found the way ``Recognizer.listen`` finds them (RMS
+    above the recognizer's energy threshold). A phrase starts at the first
+    voiced chunk after more than ``pause_threshold`` of quiet; ``take``
+    returns the span of its speech once ``listen`` has returned it. Within
+    the first and last voiced chunks the edges are placed on ``slice``
+    second slices, so they are not rounded out to whole chunks.
+    """
+
+    def __init__(self, stream, clock, source, recognizer, microphone, slice=0.01):
+        self.stream = stream
+        self.clock = clock
+        self.sample_rate = source.SAMPLE_RATE
+        self.sample_width = source.SAMPLE_WIDTH
+        self.recognizer = recognizer
+        self.microphone = microphone
+
+        seconds_per_buffer = float(source.CHUNK) / source.SAMPLE_RATE
+        self.pause_count = int(math.ceil(recognizer.pause_threshold / seconds_per_buffer))
+        self.slice_bytes = max(int(slice * source.SAMPLE_RATE), 1) * source.SAMPLE_WIDTH
+        self.start = None
+        self.end = None
+        self.quiet = 0
+
+    def read(self, size):
+        buffer = self.stream.read(size)
+        if not buffer:
+            return buffer
+        samples = len(buffer) // self.sample_width
+        position = self.clock.advance(samples, self.sample_rate,
+                                      getattr(self.microphone, "dropped_seconds", 0.0))
+        if audioop.rms(buffer, self.sample_width) > self.recognizer.energy_threshold:
+            first, last = self._voiced_edges(buffer)
+            if self.start is None or self.quiet > self.pause_count:
+                self.start = position + first / self.sample_rate
+            self.end = position + last / self.sample_rate
+            self.quiet = 0
+        else:
+            self.quiet += 1
+        return buffer
+
+    def _voiced_edges(self, buffer):
+        """Sample offsets of the start of the first and the end of the last voiced slice"""
+        threshold = self.recognizer.energy_threshold
+        starts = range(0, len(buffer), self.slice_bytes)
+        voiced = [offset for offset in starts
+                  if audioop.rms(buffer[offset:offset + self.slice_bytes], self.sample_width) > threshold]
+        if not voiced:  # loud overall, but no single slice is
+            return 0, len(buffer) // self.sample_width
+        last = min(voiced[-1] + self.slice_bytes, len(buffer))
+        return voiced[0] // self.sample_width, last // self.sample_width
+
+    def take(self):
+        """(start, end) clock positions of the speech ``listen`` just returned, or None"""
+        span = (self.start, self.end) if self.start is not None else None
+        self.start = self.end = None
+        self.quiet = 0
+        return span
+
+    def close(self):
+        self.stream.close()
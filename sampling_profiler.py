@@ -0,0 +1,142 @@
+"""
+Sampling Profiler for Speech Transcriber
+Samples every thread's stack for a fixed window and writes a
+flamegraph-compatible collapsed-stack file to the logs directory
+"""
+
+import collections
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+
+class SamplingProfiler:
+    """Periodically snapshots ``sys._current_frames()`` while switched on
+
+    Nothing is installed in the interpreter: when the profiler is off there
+    is no sampling thread and no trace or profile hook, so it costs nothing.
+    Each finished window is written as ``profile_<date>_<time>.collapsed``
+    with one ``thread;outer;...;inner count`` line per distinct stack, the
+    input format of flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, logs_dir, interval=0.005, default_duration=10.0):
+        self.logs_dir = logs_dir
+        self.interval = interval
+        self.default_duration = default_duration
+        self.lock = threading.Lock()
+        self.stop_event = None
+        self.on_finish = None  # called with the written path (or None) from the sampler thread
+
+    @property
+    def is_running(self):
+        return self.stop_event is not None
+
+    def start(self, duration=None):
+        """Sample all threads for ``duration`` seconds; returns False if already running"""
+        with self.lock:
+            if self.stop_event is not None:
+                return False
+            self.stop_event = threading.Event()
+            stop_event = self.stop_event
+        duration = duration if duration is not None else self.default_duration
+        threading.Thread(target=self._sample, args=(stop_event, duration),
+                         name="sampling-profiler", daemon=True).start()
+        print(f"Profiling all threads for {duration:g} s...")
+        return True
+
+    def stop(self):
+        """End the current window early; the samples so far are still written"""
+        with self.lock:
+            if self.stop_event is not None:
+                self.stop_event.set()
+
+    def toggle(self, duration=None):
+        if self.is_running:
+            self.stop()
+        else:
+            self.start(duration)
+
+    def _sample(self, stop_event, duration):
+        own_ident = threading.get_ident()
+        stacks = collections.Counter()
+        samples = 0
+        deadline = time.monotonic() + duration
+        while not stop_event.is_set() and time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stacks[self._collapse(names.get(ident, f"thread-{ident}"), frame)] += 1
+            samples += 1
+            stop_event.wait(self.interval)
+
+        path = self._write(stacks)
+        with self.lock:
+            self.stop_event = None
+        if path:
+            print(f"Profile of {samples} samples saved to: {path}")
+        if self.on_finish:
+            self.on_finish(path)
+
+    @staticmethod
+    def _collapse(thread_name, frame):
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        # Semicolons separate frames in the collapsed format
+        return ";".join(name.replace(";", ":") for name in reversed(frames))
+
+    def _write(self, stacks):
+        if not stacks:
+            return None
+        filename = f"profile_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.collapsed"
+        filepath = os.path.join(self.logs_dir, filename)
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            print(f"Error saving profile: {e}")
+            return None
+        return filepath
+
+
+def add_profiler_menu(root, profiler, duration=None):
+    """Add a Tools menu with a profiling toggle to a Tk window"""
+    import tkinter as tk
+
+    duration = duration if duration is not None else profiler.default_duration
+    start_label = f"Start Profiling ({duration:g} s)"
+
+    menubar = root.nametowidget(root["menu"]) if root["menu"] else tk.Menu(root)
+    tools_menu = tk.Menu(menubar, tearoff=0)
+    menubar.add_cascade(label="Tools", menu=tools_menu)
+    root.config(menu=menubar)
+
+    def set_label(label):
+        tools_menu.entryconfig(0, label=label)
+
+    def toggle():
+        profiler.toggle(duration)
+        set_label("Stop Profiling" if profiler.is_running else start_label)
+
+    # Restore the label when the window ends on its own
+    profiler.on_finish = lambda path: root.after(0, set_label, start_label)
+    tools_menu.add_command(label=start_label, command=toggle)
+    return tools_menu
+
+
+def install_signal_handler(profiler, signum=None):
+    """Toggle the profiler on SIGUSR2 (``kill -USR2 <pid>``) where available"""
+    signum = signum if signum is not None else getattr(signal, "SIGUSR2", None)
+    if signum is None:
+        return False  # Windows has no user signals; use the menu or --profile
+    signal.signal(signum, lambda *_: profiler.toggle())
+    return True
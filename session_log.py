@@ -0,0 +1,139 @@
+"""
+Session Log for Speech Transcriber
+The transcriptions of one session, with only the most recent ones kept in
+memory; older ones are spilled to disk and streamed into the session file
+when it is saved
+"""
+
+import collections
+import itertools
+import json
+import os
+import threading
+from datetime import datetime
+
+import metrics
+
+
+class SessionLog:
+    """A session's transcriptions, saved in the session file format
+
+    Records are appended to ``recent``. Once it holds more than ``window``
+    records the oldest half is appended, as JSON lines, to a spill file next
+    to the session file (``<session>.spill.jsonl``), so memory stays the same
+    however long the session runs. Totals are counted as records arrive.
+    ``save`` writes the session file by streaming the spilled records back
+    one at a time, followed by the recent ones. ``close`` removes the spill
+    file once everything in it has been saved; until then it also keeps the
+    older transcriptions if the process dies.
+    """
+
+    def __init__(self, path, header, start_time=None, window=500):
+        self.path = path
+        self.spill_path = os.path.splitext(path)[0] + ".spill.jsonl"
+        self.header = dict(header)
+        self.start_time = start_time or datetime.now()
+        self.window = window
+
+        self.lock = threading.Lock()
+        self.recent = collections.deque()
+        self.spill_file = None
+        self.spilled = 0
+        self.saved = 0
+        self.transcription_count = 0
+        self.word_count = 0
+
+    def add(self, text, details=None, timestamp=None):
+        """Record one transcription; returns its record"""
+        timestamp = timestamp or datetime.now().strftime("%H:%M:%S")
+        record = {
+            "timestamp": timestamp,
+            "text": text,
+            "full_entry": f"[{timestamp}] {text}",
+            "word_count": len(text.split())
+        }
+        record.update(details or {})
+        with self.lock:
+            self.recent.append(record)
+            self.transcription_count += 1
+            self.word_count += record["word_count"]
+            if len(self.recent) > self.window:
+                self._spill(len(self.recent) - self.window // 2)
+        return record
+
+    def _spill(self, count):
+        lines = [json.dumps(record, ensure_ascii=False) + "\n" for record in itertools.islice(self.recent, count)]
+        try:
+            if self.spill_file is None:
+                self.spill_file = open(self.spill_path, "a", encoding="utf-8")
+            self.spill_file.writelines(lines)
+            self.spill_file.flush()
+        except OSError as e:
+            # Keep the records in memory rather than lose them
+            print(f"Error spilling session to {self.spill_path}: {e}")
+            self.window *= 2
+            return
+        for _ in range(count):
+            self.recent.popleft()
+        self.spilled += count
+        metrics.SESSION_SPILLED.inc(count)
+
+    def _records(self):
+        if self.spilled:
+            with open(self.spill_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+        yield from self.recent
+
+    def save(self):
+        """Write the session file; returns its path, or None if there is nothing to save"""
+        with self.lock:
+            if not self.transcription_count:
+                return None
+            end_time = datetime.now()
+            totals = {
+                "end_time": end_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "duration_minutes": (end_time - self.start_time).total_seconds() / 60,
+                "total_transcriptions": self.transcription_count,
+                "total_words": self.word_count,
+            }
+            partial = self.path + ".tmp"
+            with open(partial, "w", encoding="utf-8") as f:
+                _write_session(f, self.header, self._records(), totals)
+            os.replace(partial, self.path)
+            self.saved = self.transcription_count
+        return self.path
+
+    def close(self):
+        """End the session, removing the spill file if everything in it has been saved"""
+        with self.lock:
+            if self.spill_file is not None:
+                self.spill_file.close()
+                self.spill_file = None
+                if self.saved == self.transcription_count:
+                    os.remove(self.spill_path)
+
+    def stats_summary(self):
+        with self.lock:
+            return (f"Session log: {self.transcription_count} transcriptions, "
+                    f"{len(self.recent)} in memory, {self.spilled} spilled to disk")
+
+
+def _write_session(f, header, records, totals):
+    """``json.dump(..., indent=2)`` of the session, without holding every record at once"""
+    def value(obj, depth):
+        return json.dumps(obj, indent=2, ensure_ascii=False).replace("\n", "\n" + "  " * depth)
+
+    f.write("{\n")
+    for key, obj in header.items():
+        f.write(f"  {json.dumps(key)}: {value(obj, 1)},\n")
+    f.write('  "transcriptions": [')
+    empty = True
+    for record in records:
+        f.write("\n    " if empty else ",\n    ")
+        f.write(value(record, 2))
+        empty = False
+    f.write("]" if empty else "\n  ]")
+    for key, obj in totals.items():
+        f.write(f",\n  {json.dumps(key)}: {value(obj, 1)}")
+    f.write("\n}")
@@ -0,0 +1,163 @@
+"""
+Speaker Turns for Speech Transcriber
+A CPU-only speaker-change detector based on spectral statistics, run on
+each capture as it arrives; every transcription is tagged with a turn id
+"""
+
+import audioop
+import math
+import threading
+import time
+
+
+FEATURE_NAMES = ("level", "slope", "curvature", "smooth", "smoother", "crossings")
+
+
+def _shift_add(fragment, width, factor):
+    """``x[n + 1] + factor * x[n]``: a one-tap difference (-1) or smoothing (+1) filter"""
+    return audioop.add(fragment[width:], audioop.mul(fragment[:-width], width, factor), width)
+
+
+def frame_features(frame, width):
+    """Spectral shape of one frame, or None if it is too quiet to describe
+
+    Energy after first and second differences rises with high-frequency
+    content and energy after smoothing with low-frequency content; their
+    log ratios to the frame energy give a gain-independent spectral tilt.
+    All filtering is done by audioop, so a frame costs a few microseconds.
+    """
+    rms = audioop.rms(frame, width)
+    if rms <= 0:
+        return None
+    # Halve before filtering so sums and differences cannot clip
+    half = audioop.mul(frame, width, 0.5)
+    slope = _shift_add(half, width, -1)
+    curvature = _shift_add(slope, width, -1)
+    smooth = _shift_add(half, width, 1)
+    smoother = _shift_add(audioop.mul(smooth, width, 0.5), width, 1)
+    samples = len(frame) // width
+
+    def log_ratio(filtered, gain):
+        return math.log((audioop.rms(filtered, width) + 1) * gain / rms)
+
+    return (
+        math.log(rms),
+        log_ratio(slope, 2),
+        log_ratio(curvature, 2),
+        log_ratio(smooth, 2),
+        log_ratio(smoother, 4),
+        audioop.cross(frame, width) / samples,
+    )
+
+
+class _FeatureStats:
+    """Running mean and variance of feature vectors"""
+
+    def __init__(self, size=len(FEATURE_NAMES)):
+        self.count = 0
+        self.sums = [0.0] * size
+        self.squares = [0.0] * size
+
+    def add(self, vector):
+        self.count += 1
+        for index, value in enumerate(vector):
+            self.sums[index] += value
+            self.squares[index] += value * value
+
+    def merge(self, other):
+        self.count += other.count
+        for index in range(len(self.sums)):
+            self.sums[index] += other.sums[index]
+            self.squares[index] += other.squares[index]
+
+    def mean(self):
+        return [total / self.count for total in self.sums]
+
+    def variance(self):
+        mean = self.mean()
+        return [max(square / self.count - m * m, 0.0) for square, m in zip(self.squares, mean)]
+
+
+class SpeakerTurnDetector:
+    """Assigns consecutive captures to speaker turns
+
+    Each capture is summarised by the mean spectral features of its voiced
+    frames and compared with the running statistics of the current turn;
+    a normalised distance above ``threshold`` starts a new turn. Level is
+    left out of the comparison so a speaker moving closer to the
+    microphone is not a new speaker. At most ``max_frames_per_second``
+    frames of ``frame_seconds`` are analysed per second of audio, which
+    bounds the cost however long the captures get. Captures with fewer
+    than ``min_voiced_frames`` voiced frames stay in the current turn.
+    """
+
+    COMPARED = tuple(range(1, len(FEATURE_NAMES)))  # every feature except level
+    MIN_SCALE = (0.0, 0.15, 0.15, 0.1, 0.1, 0.01)   # floors for the per-feature spread
+
+    def __init__(self, threshold=1.6, frame_seconds=0.02, max_frames_per_second=25, min_voiced_frames=8):
+        self.threshold = threshold
+        self.frame_seconds = frame_seconds
+        self.max_frames_per_second = max_frames_per_second
+        self.min_voiced_frames = min_voiced_frames
+
+        self.lock = threading.Lock()
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.reset()
+
+    def reset(self):
+        """Start a new session at turn 1"""
+        with self.lock:
+            self.turn = 1
+            self.turn_stats = None
+            self.changes = 0
+
+    def observe(self, audio, energy_threshold=0.0):
+        """Analyse one capture and return the turn id it belongs to"""
+        started = time.process_time()
+        capture = self._capture_stats(audio, energy_threshold)
+        with self.lock:
+            if capture.count >= self.min_voiced_frames:
+                if self.turn_stats is not None and self.distance(self.turn_stats, capture) > self.threshold:
+                    self.turn += 1
+                    self.changes += 1
+                    self.turn_stats = None
+                if self.turn_stats is None:
+                    self.turn_stats = capture
+                else:
+                    self.turn_stats.merge(capture)
+            self.audio_seconds += len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+            self.cpu_seconds += time.process_time() - started
+            return self.turn
+
+    def _capture_stats(self, audio, energy_threshold):
+        width = audio.sample_width
+        frame_bytes = max(int(audio.sample_rate * self.frame_seconds), 2) * width
+        step_bytes = max(frame_bytes, int(audio.sample_rate / self.max_frames_per_second) * width)
+        data = audio.frame_data
+
+        stats = _FeatureStats()
+        for offset in range(0, len(data) - frame_bytes + 1, step_bytes):
+            frame = data[offset:offset + frame_bytes]
+            if audioop.rms(frame, width) <= energy_threshold:
+                continue
+            features = frame_features(frame, width)
+            if features is not None:
+                stats.add(features)
+        return stats
+
+    def distance(self, turn_stats, capture):
+        """Root-mean-square difference of mean features, in units of the turn's spread"""
+        turn_mean, capture_mean = turn_stats.mean(), capture.mean()
+        variance = turn_stats.variance()
+        total = 0.0
+        for index in self.COMPARED:
+            scale = max(math.sqrt(variance[index]), self.MIN_SCALE[index])
+            total += ((capture_mean[index] - turn_mean[index]) / scale) ** 2
+        return math.sqrt(total / len(self.COMPARED))
+
+    def stats_summary(self):
+        with self.lock:
+            per_second_ms = self.cpu_seconds / self.audio_seconds * 1000 if self.audio_seconds else 0.0
+            return (f"Speaker turns: {self.turn} turns ({self.changes} changes), "
+                    f"{per_second_ms:.1f} ms CPU per second of audio")
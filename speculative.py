@@ -0,0 +1,181 @@
+"""
+Speculative Recognition for Speech Transcriber
+Starts recognizing a phrase as soon as its closing pause begins, instead of
+waiting out the full ``pause_threshold`` before the audio is sent
+"""
+
+import audioop
+import collections
+import math
+import threading
+import time
+
+import speech_recognition as sr
+
+import metrics
+
+
+_OUTCOMES = {
+    outcome: metrics.SPECULATIONS.labels(outcome=outcome)
+    for outcome in ("started", "committed", "cancelled", "discarded")
+}
+
+
+class Speculation:
+    """One early recognition request for the phrase heard so far
+
+    ``cancel`` withdraws the request from the recognition pool if it has not
+    started yet; a request already on the wire finishes, but its result is
+    never used. ``cancelled`` lets the recognition job skip the request when
+    it is cancelled while the audio is still being encoded. Stage times are
+    collected with ``mark`` like an utterance trace's and copied onto the
+    capture's trace by ``stamp``.
+
+    A result can be shown as a preview before it is committed; ``on_cancel``
+    is then called to take the preview back if speech resumes.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.future = None
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.previewed = False
+        self.on_cancel = None
+        self.stamps = {}
+
+    def mark(self, stage, when=None):
+        self.stamps[stage] = when if when is not None else time.time()
+
+    def stamp(self, trace):
+        """Copy the stage times onto ``trace``
+
+        The work happened before the capture was even enqueued; stages are
+        clamped to the enqueue time so the trace shows the time the capture
+        actually waited for its result.
+        """
+        enqueued = trace.get("enqueue") or 0.0
+        for stage, when in self.stamps.items():
+            trace.mark(stage, max(when, enqueued))
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+    def cancel(self):
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.event.set()
+            if self.previewed and self.on_cancel:
+                self.on_cancel()
+        if self.future is not None and not self.pool.cancel(self.future):
+            _OUTCOMES["discarded"].inc()  # already sent; its result is ignored
+        else:
+            _OUTCOMES["cancelled"].inc()
+
+    def preview(self, show):
+        """Call ``show()`` unless the speculation has been cancelled"""
+        with self.lock:
+            if not self.event.is_set():
+                self.previewed = True
+                show()
+
+    def commit(self):
+        _OUTCOMES["committed"].inc()
+        return self.future
+
+
+class SpeculativeTap:
+    """Wraps a microphone stream and starts recognition at pause onset
+
+    The tap follows ``Recognizer.listen``'s own phrase detection on every
+    chunk it reads: the same energy threshold, the same ``non_speaking_duration``
+    of leading audio and the same ``pause_threshold`` end condition. After
+    ``delay`` seconds of quiet inside a phrase at least ``phrase_threshold``
+    long (shorter ones are dropped by ``listen``) it calls
+    ``start(audio, speculation)`` with the phrase so far, which returns a
+    Future of ``(text, confidence)``, or None to let the phrase go without
+    a speculation. A voiced chunk after that cancels the speculation; if
+    ``listen`` returns instead, ``take`` hands the still-valid speculation
+    to the caller to use as the capture's recognition result.
+    """
+
+    def __init__(self, stream, source, recognizer, pool, start, delay):
+        self.stream = stream
+        self.sample_rate = source.SAMPLE_RATE
+        self.sample_width = source.SAMPLE_WIDTH
+        self.recognizer = recognizer
+        self.pool = pool
+        self.start = start
+
+        seconds_per_buffer = float(source.CHUNK) / source.SAMPLE_RATE
+        self.delay_count = max(int(math.ceil(delay / seconds_per_buffer)), 1)
+        self.pause_count = int(math.ceil(recognizer.pause_threshold / seconds_per_buffer))
+        self.phrase_count = int(math.ceil(recognizer.phrase_threshold / seconds_per_buffer))
+        self.leading = collections.deque(
+            maxlen=int(math.ceil(recognizer.non_speaking_duration / seconds_per_buffer)) or None)
+
+        self.frames = None  # chunks of the current phrase, None until speech starts
+        self.lead = 0       # leading chunks before the phrase's first voiced one
+        self.quiet = 0
+        self.speculation = None
+
+    def read(self, size):
+        buffer = self.stream.read(size)
+        if not buffer:
+            return buffer
+        voiced = audioop.rms(buffer, self.sample_width) > self.recognizer.energy_threshold
+
+        if self.frames is None:
+            self.leading.append(buffer)
+            if voiced:
+                if self.speculation is not None:
+                    # listen dropped the last phrase as too short and kept going
+                    self.speculation.cancel()
+                    self.speculation = None
+                self.frames = list(self.leading)
+                self.lead = len(self.frames) - 1
+                self.quiet = 0
+            return buffer
+
+        self.frames.append(buffer)
+        if voiced:
+            self.quiet = 0
+            if self.speculation is not None:
+                # Speech resumed, so the phrase is not over yet
+                self.speculation.cancel()
+                self.speculation = None
+            return buffer
+
+        self.quiet += 1
+        if self.quiet == self.delay_count and self.speculation is None:
+            # listen's own minimum: voiced start to last voiced chunk
+            if len(self.frames) - self.lead - self.quiet >= self.phrase_count:
+                speculation = Speculation(self.pool)
+                audio = sr.AudioData(b"".join(self.frames), self.sample_rate, self.sample_width)
+                speculation.future = self.start(audio, speculation)
+                if speculation.future is not None:
+                    self.speculation = speculation
+                    _OUTCOMES["started"].inc()
+        elif self.quiet > self.pause_count:
+            # listen ends (or discards) the phrase here; follow it
+            self.frames = None
+            self.leading.clear()
+        return buffer
+
+    def take(self):
+        """The speculation covering the phrase ``listen`` just returned, or None"""
+        speculation, self.speculation = self.speculation, None
+        self.frames = None
+        self.leading.clear()
+        return speculation
+
+    def discard(self):
+        """Cancel any speculation left behind by a stopped or failed listen"""
+        speculation = self.take()
+        if speculation is not None:
+            speculation.cancel()
+
+    def close(self):
+        self.stream.close()
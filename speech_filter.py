@@ -0,0 +1,97 @@
+"""
+Speech Filter for Speech Transcriber
+Rejects captures that are clearly not speech (key clicks, fan hum, hiss)
+before they are sent for recognition
+"""
+
+import audioop
+import math
+import threading
+import time
+
+import metrics
+
+
+class SpeechFilter:
+    """Rule-based speech/non-speech classifier on frame energy and zero crossings
+
+    Only frames louder than the recognizer's energy threshold are looked at,
+    since those are what made ``listen`` return. A capture is rejected as
+
+    - ``too_short``: less than ``min_speech_seconds`` of loud frames (clicks, bumps)
+    - ``stationary``: loudness varies by less than ``min_modulation_db``
+      across the loud frames (fans, hum); speech rises and falls with syllables
+    - ``unvoiced``: fewer than ``min_voiced_fraction`` of the loud frames
+      have the low zero-crossing rate of voiced speech (hiss, rustling)
+
+    The limits are deliberately loose so that real speech, which passes all
+    three by a wide margin, is never dropped.
+    """
+
+    def __init__(self, frame_seconds=0.02, min_speech_seconds=0.15, min_modulation_db=2.5,
+                 voiced_crossing_hz=1500.0, min_voiced_fraction=0.2):
+        self.frame_seconds = frame_seconds
+        self.min_speech_seconds = min_speech_seconds
+        self.min_modulation_db = min_modulation_db
+        self.voiced_crossing_hz = voiced_crossing_hz
+        self.min_voiced_fraction = min_voiced_fraction
+
+        self.lock = threading.Lock()
+        self.checked = 0
+        self.rejected = {}
+        self.cpu_seconds = 0.0
+
+    def classify(self, audio, energy_threshold):
+        """Return None for speech, otherwise the reason the capture was rejected"""
+        started = time.process_time()
+        reason = self._classify(audio, energy_threshold)
+        with self.lock:
+            self.checked += 1
+            self.cpu_seconds += time.process_time() - started
+            if reason is not None:
+                self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        if reason is not None:
+            metrics.RECOGNITION_AVOIDED.labels(reason=reason).inc()
+        return reason
+
+    def check(self, audio, energy_threshold):
+        """``classify`` without counting, for audio that is classified again once captured"""
+        return self._classify(audio, energy_threshold)
+
+    def _classify(self, audio, energy_threshold):
+        width = audio.sample_width
+        frame_bytes = max(int(audio.sample_rate * self.frame_seconds), 2) * width
+        data = audio.frame_data
+
+        levels_db = []
+        voiced = 0
+        for offset in range(0, len(data) - frame_bytes + 1, frame_bytes):
+            frame = data[offset:offset + frame_bytes]
+            rms = audioop.rms(frame, width)
+            if rms <= energy_threshold:
+                continue
+            levels_db.append(20 * math.log10(rms))
+            # Crossings per second, about twice the dominant frequency
+            crossing_hz = audioop.cross(frame, width) / self.frame_seconds / 2
+            if crossing_hz < self.voiced_crossing_hz:
+                voiced += 1
+
+        if len(levels_db) * self.frame_seconds < self.min_speech_seconds:
+            return "too_short"
+        mean_db = sum(levels_db) / len(levels_db)
+        spread_db = math.sqrt(sum((level - mean_db) ** 2 for level in levels_db) / len(levels_db))
+        if spread_db < self.min_modulation_db:
+            return "stationary"
+        if voiced < self.min_voiced_fraction * len(levels_db):
+            return "unvoiced"
+        return None
+
+    def stats_summary(self):
+        with self.lock:
+            avoided = sum(self.rejected.values())
+            if not self.checked:
+                return "Speech filter: no captures"
+            reasons = ", ".join(f"{reason} {count}" for reason, count in sorted(self.rejected.items()))
+            return (f"Speech filter: {avoided} of {self.checked} captures rejected"
+                    f"{f' ({reasons})' if reasons else ''}, "
+                    f"{self.cpu_seconds / self.checked * 1000:.2f} ms CPU per capture")
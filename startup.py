@@ -0,0 +1,78 @@
+"""
+Startup Helpers for Speech Transcriber
+Lazy module imports and background initialization so the window appears
+before speech_recognition, PyAudio and the microphone are ready
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+
+BENCHMARK_ENV = "TRANSCRIBER_STARTUP_BENCHMARK"
+
+
+def lazy_import(name):
+    """Return ``name`` as a module that is only executed on first attribute access"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+class BackgroundStartup:
+    """Runs slow initialization off the Tk thread and reports back on it
+
+    ``initialize(progress)`` runs on a worker thread and may call
+    ``progress(message)`` as it goes; ``on_progress(message)`` and
+    ``on_ready(error)`` are called on the Tk thread. With
+    ``TRANSCRIBER_STARTUP_BENCHMARK`` set, the window and ready times are
+    printed for startup_benchmark.py and the app closes once ready.
+    """
+
+    def __init__(self, root, initialize, on_ready, on_progress=None):
+        self.root = root
+        self.initialize = initialize
+        self.on_ready = on_ready
+        self.on_progress = on_progress
+        self.benchmark = bool(os.environ.get(BENCHMARK_ENV))
+        self.window_shown = False
+
+        root.bind("<Map>", self._mapped, add="+")
+        threading.Thread(target=self._run, name="startup", daemon=True).start()
+
+    def _mapped(self, event):
+        if event.widget is self.root and not self.window_shown:
+            self.window_shown = True
+            self._report("window")
+
+    def _progress(self, message):
+        if self.on_progress:
+            self.root.after(0, self.on_progress, message)
+
+    def _run(self):
+        try:
+            self.initialize(self._progress)
+            error = None
+        except Exception as e:
+            error = e
+        self.root.after(0, self._finish, error)
+
+    def _finish(self, error):
+        self.on_ready(error)
+        self._report("ready" if error is None else "failed")
+        if self.benchmark:
+            self.root.after(0, self.root.destroy)
+
+    def _report(self, event):
+        if self.benchmark:
+            print(f"STARTUP {event} {time.time():.6f}", flush=True)
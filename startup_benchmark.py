@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for Speech Transcriber
+Measures time-to-window and time-to-ready of every version
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from startup import BENCHMARK_ENV
+
+VERSIONS = [
+    ("Standard", "transcriber.py"),
+    ("Improved", "transcriber_improved.py"),
+    ("Fast", "transcriber_fast.py"),
+    ("Real-time", "transcriber_realtime.py"),
+]
+
+WINDOW_TARGET_MS = 200
+
+
+def measure(filename, timeout=30):
+    """Launch one version in benchmark mode; returns (window_ms, ready_ms)"""
+    env = dict(os.environ, **{BENCHMARK_ENV: "1", "TRANSCRIBER_METRICS_PORT": "0"})
+    launched = time.time()
+    result = subprocess.run([sys.executable, filename], env=env, capture_output=True,
+                            text=True, timeout=timeout)
+
+    events = {}
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[0] == "STARTUP":
+            events[parts[1]] = (float(parts[2]) - launched) * 1000
+    if "window" not in events:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "no window")
+    return events["window"], events.get("ready", events.get("failed"))
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"=== Startup Benchmark ({runs} runs each, median) ===")
+    print()
+    print(f"{'Version':<12}{'Window':>10}{'Ready':>10}")
+
+    slow = []
+    for name, filename in VERSIONS:
+        try:
+            samples = [measure(filename) for _ in range(runs)]
+        except Exception as e:
+            print(f"{name:<12}  error: {e}")
+            continue
+        window_ms = statistics.median(sample[0] for sample in samples)
+        ready_ms = statistics.median(sample[1] for sample in samples)
+        print(f"{name:<12}{window_ms:>8.0f}ms{ready_ms:>8.0f}ms")
+        if window_ms > WINDOW_TARGET_MS:
+            slow.append(name)
+
+    print()
+    if slow:
+        print(f"✗ Over the {WINDOW_TARGET_MS} ms time-to-window target: {', '.join(slow)}")
+    else:
+        print(f"✓ All versions show their window within {WINDOW_TARGET_MS} ms")
+
+
+if __name__ == "__main__":
+    main()
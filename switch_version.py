@@ -1,14 +1,15 @@
 #!/usr/bin/env python3
 """
 Version Switcher for Speech Transcriber
-This script helps you choose and run different versions of the speech transcriber
+This script helps you choose and run different versions of the speech transcriber.
+All versions run in this process on one shared engine, so the microphone,
+its calibration and the encoder are set up once and kept across switches.
 """
 
-import os
-import sys
-import subprocess
 import time
 
+_engine = None  # shared TranscriberEngine, created on first use
+
 def print_menu():
     """Print the main menu"""
     print("=== Speech Transcriber ===")
@@ -36,30 +37,36 @@ def check_dependencies():
 
 def run_version(version_num):
     """Run the selected version"""
+    global _engine
     version_map = {
-        1: ("Standard Version", "transcriber.py"),
-        2: ("Improved Version", "transcriber_improved.py"),
-        3: ("Fast Version", "transcriber_fast.py"),
-        4: ("Real-time Version", "transcriber_realtime.py"),
-        5: ("Log Viewer", "log_viewer.py")
+        1: ("Standard Version", "standard"),
+        2: ("Improved Version", "improved"),
+        3: ("Fast Version", "fast"),
+        4: ("Real-time Version", "realtime"),
+        5: ("Log Viewer", None)
     }
     
     if version_num not in version_map:
         print("Invalid option. Please choose 1-6.")
         return
     
-    name, filename = version_map[version_num]
-    
-    if not os.path.exists(filename):
-        print(f"Error: {filename} not found.")
-        return
+    name, profile = version_map[version_num]
     
     print(f"Starting {name}...")
     print()
     
     try:
-        # Run the selected version
-        subprocess.run([sys.executable, filename])
+        if profile is None:
+            from log_viewer import LogViewer
+            LogViewer().run()
+            return
+        
+        # Run the selected version in-process; the profile can also be
+        # switched from inside the window
+        from transcriber_engine import TranscriberApp, TranscriberEngine
+        if _engine is None:
+            _engine = TranscriberEngine("transcription_logs")
+        TranscriberApp(profile, engine=_engine).run()
     except KeyboardInterrupt:
         print("\nApplication stopped by user.")
     except Exception as e:
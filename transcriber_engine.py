@@ -0,0 +1,1212 @@
+"""
+Transcriber Engine for Speech Transcriber
+One shared capture and recognition pipeline; the standard, improved, fast
+and real-time versions are configuration presets switched in-process
+"""
+
+import tkinter as tk
+from tkinter import scrolledtext
+import threading
+import queue
+from datetime import datetime
+import os
+import json
+import time
+import argparse
+import importlib.util
+
+from capture_state import CaptureController, CaptureStopped
+from latency_trace import LatencyTracker
+import metrics
+from overload import LOCAL, LONG_WINDOW_SCALE, LONG_WINDOWS, MERGE, NORMAL, SHED, STAGE_STATUS, OverloadController
+from phrase_finalizer import PhraseFinalizer, PhraseState, VoiceActivityTap
+from recognition_pool import FINAL, PARTIAL, RETRY, RecognitionPool
+from resampler import resampled
+from sample_clock import ClockTap, SampleClock
+from sampling_profiler import SamplingProfiler, add_profiler_menu, install_signal_handler
+from session_log import SessionLog
+from speaker_turns import SpeakerTurnDetector
+from speech_filter import SpeechFilter
+from startup import BackgroundStartup, lazy_import
+
+sr = lazy_import("speech_recognition")  # loaded by the startup thread
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+# Keys every profile must define after inheritance. "mode" picks the
+# threading model: buffered phrases merged into few requests, one request
+# per phrase ("immediate"), or real-time partial text with finalized phrases.
+# "reject_non_speech" drops clicks and noise before they reach the backend;
+# "capture_rate" is the rate audio is converted to as it is read (null keeps
+# the device's own rate). "speculative_pause" starts recognition that many
+# seconds into a pause instead of after the full pause_threshold (null: off;
+# ignored by buffered profiles, which merge captures before recognition).
+# "finalize_*" are the real-time phrase finalizer's targets (null elsewhere):
+# the pause that commits a phrase, the shorter one that does when the
+# recognizer's confidence reaches finalize_confidence, and the longest text
+# may wait. A result only arrives after listen has waited out
+# pause_threshold, so both pauses must be longer than that to mean anything.
+# "window_seconds"/"overlap_seconds" size the overlapping windows long
+# utterances are cut into, and "merge_*" the merged requests of buffered
+# phrases (longest request, longest silence merged across, silence padded
+# between phrases); the overload controller's long-windows stage scales
+# the window and the longest request.
+# "latency_slo" is the live latency, in seconds, the overload controller
+# degrades recognition to stay within.
+PROFILE_KEYS = (
+    "label", "title", "energy_threshold", "dynamic_energy_threshold", "pause_threshold",
+    "phrase_threshold", "non_speaking_duration", "calibration_seconds", "capture_rate", "mode", "windowed",
+    "reject_non_speech", "speculative_pause", "finalize_pause", "finalize_confident_pause", "finalize_confidence",
+    "finalize_max_latency", "window_seconds", "overlap_seconds", "merge_max_seconds", "merge_gap_seconds",
+    "merge_padding_seconds", "latency_slo", "listen_timeout", "phrase_time_limit", "min_buffer_duration",
+    "display_interval_ms", "instructions",
+)
+FINALIZER_SETTINGS = {
+    "finalize_pause": "pause_target",
+    "finalize_confident_pause": "confident_pause",
+    "finalize_confidence": "confidence_target",
+    "finalize_max_latency": "max_latency",
+}
+MODES = ("buffered", "immediate", "realtime")
+
+
+def load_profiles(directory=PROFILES_DIR):
+    """Read every ``<name>.json`` in ``directory`` into a dict of profiles
+
+    A profile may name another one in ``"extends"`` and only override the
+    settings that differ. Profiles are ordered by their ``"order"`` key.
+    """
+    raw = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".json"):
+            with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+                raw[filename[:-len(".json")]] = json.load(f)
+
+    profiles = {}
+
+    def resolve(name, chain=()):
+        if name in profiles:
+            return profiles[name]
+        if name not in raw:
+            raise ValueError(f"Profile '{chain[-1]}' extends unknown profile '{name}'")
+        if name in chain:
+            raise ValueError(f"Profile inheritance loop: {' -> '.join(chain + (name,))}")
+        settings = dict(raw[name])
+        base = settings.pop("extends", None)
+        resolved = dict(resolve(base, chain + (name,))) if base else {}
+        resolved.update(settings)
+
+        missing = [key for key in PROFILE_KEYS if key not in resolved]
+        if missing:
+            raise ValueError(f"Profile '{name}' is missing: {', '.join(missing)}")
+        if resolved["mode"] not in MODES:
+            raise ValueError(f"Profile '{name}' has unknown mode '{resolved['mode']}'")
+        if resolved["overlap_seconds"] >= resolved["window_seconds"]:
+            raise ValueError(f"Profile '{name}' needs overlap_seconds shorter than window_seconds")
+        if resolved["mode"] == "realtime":
+            if None in (resolved[key] for key in FINALIZER_SETTINGS):
+                raise ValueError(f"Real-time profile '{name}' needs every finalize_* setting")
+            if not resolved["pause_threshold"] < resolved["finalize_confident_pause"] <= resolved["finalize_pause"]:
+                raise ValueError(f"Profile '{name}' needs pause_threshold < finalize_confident_pause "
+                                 f"<= finalize_pause")
+        profiles[name] = resolved
+        return resolved
+
+    for name in raw:
+        resolve(name)
+    return dict(sorted(profiles.items(), key=lambda item: (item[1].get("order", 100), item[0])))
+
+
+PROFILES = load_profiles()
+
+RECOGNIZER_SETTINGS = ("dynamic_energy_threshold", "pause_threshold", "phrase_threshold", "non_speaking_duration")
+
+# Transcription lines kept in the window; the full session is in its log
+DISPLAY_LINES = 1000
+
+
+class TranscriberEngine:
+    """Microphone, recognizer and recognition pipeline shared by all profiles
+
+    Everything expensive lives here and is created once per process: the
+    speech_recognition import, the microphone, the ambient-noise
+    calibration, the FLAC encoder and the window recognizer pool. Switching
+    profiles only changes recognizer settings and the listening mode.
+
+    Results are reported through ``on_transcription(text, traces, details)``,
+    ``on_partial(text)`` and ``on_status(text)``, called from worker threads.
+
+    Several engines can run side by side, one per audio source: give each a
+    ``source`` label and ``device_index`` and pass them the same ``pool``
+    and ``encoder`` so all sources share one set of recognition workers.
+    """
+
+    def __init__(self, logs_dir, source=None, device_index=None, pool=None, encoder=None):
+        self.logs_dir = logs_dir
+        self.source = source
+        self.device_index = device_index
+        self.pool = pool
+        self.encoder = encoder
+        self.on_transcription = lambda text, traces, details: None
+        self.on_partial = lambda text: None
+        self.on_status = lambda text: None
+
+        self.profile_name = "standard"
+        self.ready = False
+        self.init_lock = threading.Lock()
+        self.recognizer = None
+        self.microphone = None
+        self.limiter = None
+
+        # Microphone state management; a stop wakes the listener's pending read
+        self.capture = CaptureController()
+        self.capture.on_stop = self.interrupt_microphone
+
+        # Per-utterance latency traces and histograms
+        self.latency = LatencyTracker(self.logs_dir)
+
+        # Session timeline in captured samples; entries carry their speech span on it
+        self.clock = SampleClock()
+
+        # Non-speech captures are rejected before any recognition request
+        self.speech_filter = SpeechFilter()
+
+        # Speaker-change detection; every capture's trace carries its turn id
+        self.speaker_turns = SpeakerTurnDetector()
+
+        # Steps down to cheaper recognition when the pipeline falls behind
+        self.overload = OverloadController(source=source)
+        self.overload.on_change = self.on_overload_change
+        self.window_scale = 1.0  # LONG_WINDOW_SCALE in the long-windows stage
+        self.local_model = False
+
+        # Opt-in raw audio archive, one file per session
+        self.archive_audio = False
+        self.archive = None
+
+        # Audio buffering for continuous speech (buffered profiles)
+        self.merger = None
+        self.audio_buffer = []
+        self.buffer_lock = threading.Lock()
+        self.last_transcription_time = 0
+
+        # Real-time phrase state (real-time profile)
+        self.finalizer = PhraseFinalizer()
+        self.phrase = PhraseState(self.finalizer)
+        self.is_actively_listening = False
+
+    @property
+    def profile(self):
+        return PROFILES[self.profile_name]
+
+    def attach(self, on_transcription, on_partial, on_status):
+        """Route results to a (new) front end"""
+        self.on_transcription = on_transcription
+        self.on_partial = on_partial
+        self.on_status = on_status
+
+    def initialize(self, progress, profile_name=None, calibrate=True):
+        """Load speech recognition and open the microphone; later calls return at once
+
+        With ``calibrate`` false the ambient-noise calibration is left to a
+        separate ``calibrate`` call, so several sources can calibrate at once.
+        """
+        with self.init_lock:
+            if profile_name is not None:
+                self.profile_name = profile_name
+            if self.ready:
+                return
+
+            progress("Loading speech recognition...")
+            from audio_encoder import EncoderStage
+            from audio_merger import AudioMerger
+            from callback_capture import CallbackMicrophone
+            from chunker import WindowedRecognizer
+            from rate_limiter import limiter_for
+
+            self.recognizer = sr.Recognizer()
+            # Requests on the shared default key are paced to its quota
+            self.limiter = limiter_for(None)
+            self.microphone = CallbackMicrophone(device_index=self.device_index)
+
+            # The first profile's threshold seeds the calibration; the
+            # calibrated value is then kept across profile switches
+            self.recognizer.energy_threshold = self.profile["energy_threshold"]
+            self.apply_profile(self.profile_name)
+
+            if calibrate:
+                self.calibrate(progress)
+
+            # Long-lived FLAC encoder so recognition threads never fork/exec flac
+            if self.encoder is None:
+                self.encoder = EncoderStage()
+
+            # Every recognition request runs on the (possibly shared) worker pool
+            if self.pool is None:
+                self.pool = RecognitionPool()
+
+            # Long utterances are cut into overlapping windows recognized in parallel
+            self.windowed_recognizer = WindowedRecognizer(
+                self.recognize_window, self.emit_transcription,
+                window_seconds=self.profile["window_seconds"] * self.window_scale,
+                overlap_seconds=self.profile["overlap_seconds"], executor=self.pool.executor(self.source))
+
+            # Overload: the local model is a stage only if it is installed
+            self.overload.max_backlog = self.pool.workers * 2
+            self.local_model = importlib.util.find_spec("pocketsphinx") is not None
+            self.overload.available = self.overload_stages(self.profile)
+
+            # Buffered phrases are merged into as few recognition requests as possible
+            self.merger = AudioMerger()
+            self.apply_merge_settings()
+            threading.Thread(target=self.buffer_processor, name=self.qualified("buffer-processor"),
+                             daemon=True).start()
+
+            metrics.QUEUE_DEPTH.labels(queue="encoder").set_function(self.encoder.qsize)
+            metrics.QUEUE_DEPTH.labels(queue=self.qualified("audio_buffer")).set_function(
+                lambda: len(self.audio_buffer))
+            if self.source is None:
+                # The metrics endpoint pulls in http.server, so it starts here too;
+                # multi-source front ends start it once for all engines
+                metrics.start_http_server()
+            self.ready = True
+
+    def calibrate(self, progress):
+        """Adjust the energy threshold for ambient noise, once per device"""
+        progress("Calibrating microphone...")
+        with self.open_microphone() as source:
+            self.recognizer.adjust_for_ambient_noise(source, duration=self.profile["calibration_seconds"])
+
+    def open_microphone(self):
+        """Enter the microphone with its stream converted to the profile's capture rate
+
+        Calibration, voice activity, recognition and the archive all see the
+        converted audio, so none of them handles more samples than needed.
+        """
+        return resampled(self.microphone, self.profile["capture_rate"], self.microphone.SAMPLE_WIDTH)
+
+    def interrupt_microphone(self):
+        if self.microphone is not None:
+            self.microphone.interrupt()
+
+    def qualified(self, name):
+        """``name`` qualified with the source label, for threads and metric labels"""
+        return name if self.source is None else f"{name}-{self.source}"
+
+    def apply_profile(self, name):
+        """Switch the recognizer settings and listening mode to ``name``"""
+        self.profile_name = name
+        self.overload.slo_seconds = self.profile["latency_slo"]
+        self.overload.available = self.overload_stages(self.profile)
+        if self.profile["mode"] == "realtime":
+            for key, setting in FINALIZER_SETTINGS.items():
+                setattr(self.finalizer, setting, self.profile[key])
+        self.apply_merge_settings()
+        if self.recognizer is not None:
+            for setting in RECOGNIZER_SETTINGS:
+                setattr(self.recognizer, setting, self.profile[setting])
+
+    def apply_merge_settings(self):
+        """Size merged requests from the profile, scaled in the long-windows stage"""
+        if self.merger is None:
+            return
+        self.merger.max_total_seconds = self.profile["merge_max_seconds"] * self.window_scale
+        self.merger.max_gap_seconds = self.profile["merge_gap_seconds"]
+        self.merger.padding_seconds = self.profile["merge_padding_seconds"]
+
+    def start(self):
+        """Begin a capture run with the current profile"""
+        self.is_actively_listening = False
+        self.reset_phrase()
+        self.speaker_turns.reset()
+        self.overload.reset()
+        self.clock.reset()
+        generation = self.capture.start()
+        threading.Thread(target=self.listen_loop, args=(generation,), name=self.qualified("listener"),
+                         daemon=True).start()
+
+    def open_archive(self, session_start_time):
+        """Start archiving captured audio for a session; returns the archive's file name"""
+        from audio_archive import AudioArchiveWriter
+
+        self.close_archive()
+        if not (self.archive_audio and self.ready):
+            return None
+        suffix = f"_{self.source}" if self.source is not None else ""
+        filename = f"audio_{session_start_time.strftime('%Y-%m-%d_%H-%M-%S')}{suffix}.tsa"
+        try:
+            self.archive = AudioArchiveWriter(os.path.join(self.logs_dir, filename),
+                                              self.profile["capture_rate"] or self.microphone.SAMPLE_RATE,
+                                              self.microphone.SAMPLE_WIDTH)
+        except OSError as e:
+            print(f"Error opening audio archive: {e}")
+            return None
+        return filename
+
+    def close_archive(self):
+        """Finish the session's archive without holding up the caller"""
+        archive, self.archive = self.archive, None
+        if archive is not None:
+            # Not a daemon, so the index is still written if the app is closing
+            threading.Thread(target=archive.close, name="audio-archive-close").start()
+
+    def stop(self):
+        """Stop capturing; the listener exits on its next microphone read"""
+        self.capture.stop()
+        self.close_archive()
+        if self.ready and self.profile["windowed"]:
+            self.windowed_recognizer.finish()
+        # Commit whatever is still waiting for finalization
+        self.complete_phrase("stop")
+
+    def refresh_microphone(self):
+        """Reopen and recalibrate the microphone; returns False if it stayed busy"""
+        if not self.capture.begin_refresh(timeout=2.0):
+            return False
+        try:
+            self.microphone = type(self.microphone)(device_index=self.device_index)
+            with self.open_microphone() as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        except Exception as e:
+            print(f"Error refreshing microphone: {e}")
+        finally:
+            self.capture.end_refresh()
+
+        self.is_actively_listening = False
+        with self.buffer_lock:
+            self.audio_buffer.clear()
+        self.reset_phrase()
+        return True
+
+    def reset_phrase(self):
+        self.phrase.clear()
+
+    def listen_loop(self, generation):
+        with self.capture.ownership(generation) as owned:
+            if not owned:
+                return
+            # Keep the device streaming between captures so no audio is lost
+            try:
+                self.microphone.open()
+            except Exception as e:
+                print(f"Error opening microphone: {e}")
+                self.on_status("Microphone unavailable")
+                return
+            try:
+                self.capture_loop(generation)
+            finally:
+                self.microphone.close()
+
+    def capture_loop(self, generation):
+        """Capture phrases until ``generation`` is stopped"""
+        from audio_encoder import EncodingTap
+        from speculative import SpeculativeTap
+
+        while self.capture.is_active(generation):
+            profile = self.profile
+            tap = None
+            try:
+                with self.open_microphone() as source:
+                    # Every chunk read advances the session's sample clock
+                    clock_tap = source.stream = ClockTap(source.stream, self.clock, source,
+                                                         self.recognizer, self.microphone)
+                    if profile["mode"] != "buffered" and source.SAMPLE_WIDTH == 2:
+                        # Phrases are sent one by one, so encode them while they are spoken
+                        source.stream = EncodingTap(source.stream, self.encoder, source, self.recognizer)
+                    if profile["mode"] == "realtime":
+                        # Report pauses to the finalizer as frames are read
+                        source.stream = VoiceActivityTap(source.stream, source.SAMPLE_WIDTH,
+                                                         self.recognizer, self.finalizer)
+                    if (profile["speculative_pause"] and profile["mode"] != "buffered"
+                            and self.overload.stage == NORMAL):
+                        # Recognition starts as the pause begins; listen returning confirms it
+                        tap = source.stream = SpeculativeTap(source.stream, source, self.recognizer, self.pool,
+                                                             self.start_speculation, profile["speculative_pause"])
+                    source.stream = self.capture.wrap(source.stream, generation)
+
+                    # Continuous speech is captured one window hop at a time
+                    if profile["windowed"]:
+                        self.windowed_recognizer.resize(profile["window_seconds"] * self.window_scale,
+                                                        profile["overlap_seconds"])
+                    audio = self.recognizer.listen(
+                        source,
+                        timeout=profile["listen_timeout"],
+                        phrase_time_limit=profile["phrase_time_limit"] or self.windowed_recognizer.hop_seconds,
+                        snowboy_configuration=None
+                    )
+                    speculation = tap.take() if tap is not None else None
+                    speech_span = clock_tap.take()
+                    metrics.CAPTURES.inc()
+                    self.is_actively_listening = True
+
+                trace = self.latency.begin(audio, pause_threshold=self.recognizer.pause_threshold,
+                                           non_speaking_duration=self.recognizer.non_speaking_duration,
+                                           speech_span=speech_span and tuple(map(self.clock.wall_time, speech_span)))
+                trace.speech_span = speech_span
+                archive = self.archive
+                if archive is not None:
+                    trace.audio_span = archive.append(audio)
+                self.check_overload()
+                # A speculation's audio has already passed the speech filter
+                if speculation is None and self.is_non_speech(audio, profile):
+                    continue
+                trace.speaker_turn = self.speaker_turns.observe(audio, self.recognizer.energy_threshold)
+                self.dispatch(audio, trace, profile, speculation)
+
+            except CaptureStopped:
+                break
+            except sr.WaitTimeoutError:
+                self.on_pause(profile)
+                continue
+            except Exception as e:
+                print(f"Listening error: {e}")
+                # Small delay to prevent rapid error loops
+                time.sleep(0.1)
+                continue
+            finally:
+                if tap is not None:
+                    tap.discard()
+
+    def is_non_speech(self, audio, profile):
+        """True if the capture should be dropped instead of recognized"""
+        if not profile["reject_non_speech"]:
+            return False
+        # Never break up a long utterance that is being recognized in windows
+        if profile["windowed"] and self.windowed_recognizer.continuing:
+            return False
+        return self.speech_filter.classify(audio, self.recognizer.energy_threshold) is not None
+
+    def dispatch(self, audio, trace, profile, speculation=None):
+        """Hand a capture to the profile's recognition path"""
+        if self.overload.shedding:
+            # Too far behind to recognize it live; archived audio can be re-transcribed later
+            if speculation is not None:
+                speculation.cancel()
+            if profile["windowed"]:
+                self.windowed_recognizer.finish()
+            metrics.OVERLOAD_SHED.labels(action="archived" if trace.audio_span else "dropped").inc()
+            return
+
+        # Long utterances go through the overlapping-window path
+        if profile["windowed"] and self.windowed_recognizer.add_capture(audio, trace):
+            if speculation is not None:
+                speculation.cancel()
+            return
+
+        if speculation is not None:
+            # The pause held, so the request started at its onset is this capture's result
+            self.commit_speculation(speculation, audio, trace, profile)
+            return
+
+        # Over the request quota or overloaded, immediate captures are merged like
+        # buffered ones (and stay merged until the backlog is sent, to keep their order)
+        coalesce = profile["mode"] == "immediate" and (
+            self.audio_buffer or not self.limiter.available() or self.overload.stage >= MERGE)
+        if coalesce:
+            metrics.RECOGNITION_COALESCED.inc()
+
+        if profile["mode"] == "buffered" or coalesce:
+            # Add to buffer instead of immediate processing
+            with self.buffer_lock:
+                # A new speaker starts a new request rather than being merged in
+                if self.audio_buffer and self.audio_buffer[-1][2].speaker_turn != trace.speaker_turn:
+                    self.process_audio_buffer()
+                self.audio_buffer.append((time.time(), audio, trace))
+                # Groups the merge policy has closed are sent now; the last one
+                # may still grow, so it waits for a pause or the buffer timer
+                self.process_audio_buffer(keep_open=True)
+            return
+
+        # Start encoding right away, then queue recognition immediately
+        encoded_audio = self.encoder.submit(audio, [trace])
+        if profile["mode"] == "realtime":
+            self.finalizer.recognition_started()
+            self.pool.submit(self.source, self.process_audio_realtime, encoded_audio, trace, priority=PARTIAL)
+        else:
+            self.pool.submit(self.source, self.process_audio_fast, encoded_audio, [trace])
+
+    def start_speculation(self, audio, speculation):
+        """Queue recognition of the phrase heard so far; returns a Future of (text, confidence)
+
+        Returns None, sending nothing, if the speech filter would reject the
+        phrase; the capture is then filtered (and counted) as usual.
+        """
+        if self.profile["reject_non_speech"] and self.speech_filter.check(
+                audio, self.recognizer.energy_threshold) is not None:
+            return None
+        # May be thrown away, so it waits behind finals
+        future = self.pool.submit(self.source, self.recognize_speculative,
+                                  self.encoder.submit(audio, [speculation]), speculation, priority=PARTIAL)
+        if self.profile["mode"] == "realtime":
+            # Show the text while listen is still waiting out the pause
+            speculation.on_cancel = lambda: self.on_partial(self.phrase.render())
+            future.add_done_callback(lambda done: self.preview_speculation(speculation, done))
+        return future
+
+    def preview_speculation(self, speculation, future):
+        try:
+            result = future.result()
+        except Exception:
+            return  # nothing recognized (or the request failed); commit reports it
+        if result is not None:
+            text = result[0]
+            speculation.preview(lambda: self.on_partial(self.phrase.render(text)))
+
+    def recognize_speculative(self, encoded_audio, speculation):
+        audio = encoded_audio.result()
+        if speculation.cancelled:
+            return None  # speech resumed while the audio was being encoded
+        return self.recognize_traced(audio, [speculation], with_confidence=True)
+
+    def commit_speculation(self, speculation, audio, trace, profile):
+        """Use a speculation's result as the capture's, as soon as it arrives"""
+        realtime = profile["mode"] == "realtime"
+        if realtime:
+            self.finalizer.recognition_started()
+
+        def finished(future):
+            speculation.stamp(trace)
+            try:
+                if realtime:
+                    self.add_realtime_result(future.result, trace)
+                else:
+                    self.emit_result(lambda: future.result()[0], [trace],
+                                     lambda: self.process_single_audio(audio, [trace], retry=False))
+            except Exception as e:
+                print(f"Processing error: {e}")
+
+        speculation.commit().add_done_callback(finished)
+
+    def check_overload(self):
+        """Update the overload stage from the live queue's age and the backlog"""
+        backlog = (self.pool.qsize(FINAL) + self.pool.qsize(PARTIAL) + len(self.audio_buffer)
+                   + self.encoder.qsize())
+        self.overload.update(self.pool.oldest_age((FINAL, PARTIAL)), backlog)
+
+    def overload_stages(self, profile):
+        """Degradation stages that change anything for ``profile``; the others are skipped"""
+        stages = {NORMAL, SHED}
+        if profile["mode"] == "immediate":
+            stages.add(MERGE)  # buffered profiles merge anyway, real-time ones never do
+        if self.local_model:
+            stages.add(LOCAL)
+        if profile["windowed"] or profile["mode"] == "buffered":
+            stages.add(LONG_WINDOWS)
+        return stages
+
+    def on_overload_change(self, stage):
+        self.window_scale = LONG_WINDOW_SCALE if stage >= LONG_WINDOWS else 1.0
+        self.apply_merge_settings()
+        print(f"{self.qualified('overload')}: {STAGE_STATUS[stage] or 'back to normal'}")
+        self.on_status(STAGE_STATUS[stage] or "Listening... (recovered)")
+
+    def on_pause(self, profile):
+        """Listen timed out: the speaker is silent"""
+        self.check_overload()
+        if profile["windowed"]:
+            # Silence ends any long utterance in progress
+            self.windowed_recognizer.finish()
+
+        if profile["mode"] == "buffered":
+            with self.buffer_lock:
+                if self.audio_buffer:
+                    self.process_audio_buffer()
+        elif profile["mode"] == "realtime":
+            self.on_status("Listening... (active)" if self.is_actively_listening else "Listening... (waiting)")
+
+    def buffer_processor(self):
+        """Background thread to process audio buffer periodically"""
+        while True:
+            time.sleep(1)  # Check every second
+
+            with self.buffer_lock:
+                if self.audio_buffer:
+                    # Process buffer if it has been sitting for a while
+                    current_time = time.time()
+                    if current_time - self.last_transcription_time > self.profile["min_buffer_duration"]:
+                        self.process_audio_buffer()
+                        self.last_transcription_time = current_time
+
+    def process_audio_buffer(self, keep_open=False):
+        """Process accumulated audio buffer for better continuous speech recognition
+
+        With ``keep_open`` only the groups the merge policy has closed (over
+        ``max_total_seconds`` or ``max_gap_seconds`` with what followed) are
+        sent; the last group stays buffered for later captures to join.
+        """
+        if not self.audio_buffer:
+            return
+        captures = self.audio_buffer
+        if keep_open:
+            groups = self.merger.plan(self.audio_buffer)
+            if len(groups) < 2:
+                return
+            captures = self.audio_buffer[:-len(groups[-1])]
+
+        try:
+            # Combine buffered chunks into as few requests as the merge policy allows
+            requests = self.merger.merge_groups(captures)
+
+            # Hand every request to the encoder up front so encoding of later
+            # requests overlaps recognition of earlier ones
+            pending = []
+            for merged_audio, group in requests:
+                traces = [capture[2] for capture in group]
+                pending.append((self.encoder.submit(merged_audio, traces), traces))
+            # One pool job per flush keeps the requests' text in order
+            self.pool.submit(self.source, self.process_encoded_requests, pending)
+
+            del self.audio_buffer[:len(captures)]
+
+        except Exception as e:
+            print(f"Error processing audio buffer: {e}")
+            del self.audio_buffer[:len(captures)]
+
+    def process_encoded_requests(self, pending):
+        for encoded_audio, traces in pending:
+            self.process_audio_fast(encoded_audio, traces)
+
+    def process_single_audio(self, audio, traces=(), retry=True):
+        """Recognize one request and emit its text; a failed request is retried once"""
+        again = (lambda: self.process_single_audio(audio, traces, retry=False)) if retry else None
+        self.emit_result(lambda: self.recognize_traced(audio, traces), traces, again)
+
+    def emit_result(self, recognize, traces=(), retry=None):
+        """Emit the text ``recognize()`` returns; ``retry`` is queued if the request fails"""
+        try:
+            text = recognize()
+            if text.strip():
+                self.emit_transcription(text, traces)
+        except sr.UnknownValueError:
+            # Speech was unintelligible
+            pass
+        except sr.RequestError as e:
+            print(f"Recognition error: {e}")
+            if retry is not None:
+                # Behind live work, so a struggling backend is not hit harder
+                metrics.RECOGNITION_RETRIES.inc()
+                self.pool.submit(self.source, retry, priority=RETRY)
+
+    def process_audio_fast(self, encoded_audio, traces):
+        """Process audio with fast recognition"""
+        try:
+            self.process_single_audio(encoded_audio.result(), traces)
+        except Exception as e:
+            print(f"Processing error: {e}")
+
+    def process_audio_realtime(self, encoded_audio, trace):
+        """Recognize a capture and append it to the phrase being built"""
+        self.on_status("Processing...")
+        self.add_realtime_result(
+            lambda: self.recognize_traced(encoded_audio.result(), [trace], with_confidence=True), trace)
+
+    def add_realtime_result(self, recognize, trace):
+        """Append the text ``recognize()`` returns to the phrase being built"""
+        try:
+            text, confidence = recognize()
+            if text.strip():
+                # The trace completes when the phrase it belongs to is rendered;
+                # a speaker change ends the phrase being built
+                ended, rendered = self.phrase.append(text, trace, confidence)
+                if ended is not None:
+                    self.emit_phrase(ended, "speaker_change")
+                self.on_partial(rendered)
+
+            self.on_status("Listening... (active)")
+
+        except sr.UnknownValueError:
+            self.on_status("Listening... (active)")
+        except sr.RequestError as e:
+            print(f"Recognition error: {e}")
+            self.on_status("Network Error")
+        except Exception as e:
+            print(f"Processing error: {e}")
+            self.on_status("Error")
+        finally:
+            self.finalizer.recognition_finished()
+
+    def finalize_due_phrase(self):
+        """Commit the buffered phrase once the finalizer's targets are met"""
+        reason = self.finalizer.should_finalize()
+        if reason:
+            self.complete_phrase(reason)
+
+    def complete_phrase(self, reason):
+        """Emit the buffered real-time phrase as a final transcription"""
+        self.emit_phrase(self.phrase.take(), reason)
+
+    def emit_phrase(self, phrase, reason):
+        text, traces = phrase
+        if text.strip():
+            self.emit_transcription(text, traces, finalized_by=reason)
+
+    def recognize_window(self, audio, traces):
+        """Recognize one overlapping window of a long utterance"""
+        return self.recognize_traced(self.encoder.submit(audio, traces).result(), traces)
+
+    def recognize_traced(self, audio, traces, **options):
+        """Run recognition, stamping the request and response on every trace
+
+        Every live request to the service goes through here, so the API
+        key's live rate limiter sees them all (re-transcription runs are
+        paced by the key's batch limiter); time spent waiting for it counts
+        as queueing.
+        """
+        if self.overload.stage >= LOCAL and LOCAL in self.overload.available:
+            return self.recognize_local(audio, traces, **options)
+        with self.limiter.request():
+            for trace in traces:
+                trace.mark("request_sent")
+            try:
+                with metrics.recognition_request():
+                    return self.recognizer.recognize_google(audio, **options)
+            finally:
+                for trace in traces:
+                    trace.mark("response_received")
+
+    def recognize_local(self, audio, traces, with_confidence=False):
+        """Recognize with the offline model while overloaded; it reports no confidence"""
+        for trace in traces:
+            trace.mark("request_sent")
+        try:
+            with metrics.recognition_request():
+                text = self.recognizer.recognize_sphinx(audio)
+        finally:
+            for trace in traces:
+                trace.mark("response_received")
+        return (text, 0.0) if with_confidence else text
+
+    def emit_transcription(self, text, traces=(), **details):
+        for trace in traces:
+            trace.mark("finalized")
+        turns = [trace.speaker_turn for trace in traces if trace.speaker_turn is not None]
+        if turns:
+            details.setdefault("speaker_turn", turns[0])
+        # Where the entry's audio sits in the session archive
+        spans = [trace.audio_span for trace in traces if trace.audio_span is not None]
+        if spans:
+            start = min(offset for offset, _ in spans)
+            end = max(offset + duration for offset, duration in spans)
+            details["audio_offset"] = round(start, 3)
+            details["audio_duration"] = round(end - start, 3)
+        # When it was said, in seconds on the session's sample clock
+        spans = [trace.speech_span for trace in traces if trace.speech_span is not None]
+        if spans:
+            details["speech_start"] = round(min(start for start, _ in spans), 3)
+            details["speech_end"] = round(max(end for _, end in spans), 3)
+        self.on_transcription(text, traces, details)
+
+    def timestamp(self, details):
+        """Wall-clock time an entry's speech started, or now if it has no speech span"""
+        when = self.clock.wall_time(details["speech_start"]) if details and "speech_start" in details else None
+        return datetime.fromtimestamp(when if when is not None else time.time()).strftime("%H:%M:%S")
+
+
+class TranscriberApp:
+    """Transcriber window hosting one engine and any of its profiles"""
+
+    def __init__(self, profile="standard", engine=None):
+        self.root = tk.Tk()
+
+        # Create logs directory
+        self.logs_dir = "transcription_logs"
+        if not os.path.exists(self.logs_dir):
+            os.makedirs(self.logs_dir)
+
+        # The engine survives profile switches (and windows, when passed in)
+        self.engine = engine if engine is not None else TranscriberEngine(self.logs_dir)
+        self.engine.attach(self.add_transcription, self.show_partial, self.show_status)
+        self.engine.apply_profile(profile)
+
+        # State variables
+        self.is_listening = False
+        self.transcription_queue = queue.Queue()
+        self.transcription_count = 0
+        self.word_count = 0
+
+        # Prometheus-style metrics, served on http://127.0.0.1:9464/metrics
+        self.unsaved_since = None  # when the oldest transcription not yet saved was added
+        metrics.QUEUE_DEPTH.labels(queue="transcriptions").set_function(self.transcription_queue.qsize)
+        metrics.PERSISTENCE_LAG.set_function(self.persistence_lag)
+
+        # Sampling profiler, toggled from Tools menu, SIGUSR2 or --profile
+        self.profiler = SamplingProfiler(self.logs_dir)
+        install_signal_handler(self.profiler)
+        self.retranscribing = False
+
+        # Initialize current session
+        self.current_session = None
+        self.session_start_time = None
+
+        self.setup_gui()
+        self.show_profile()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.start_processing()
+
+        # Speech recognition and the microphone load in the background so
+        # the window appears right away
+        self.toggle_btn.config(state=tk.DISABLED)
+        BackgroundStartup(self.root, self.initialize_engine, self.on_engine_ready, self.show_startup_progress)
+
+    @property
+    def profile(self):
+        return self.engine.profile
+
+    def initialize_engine(self, progress):
+        self.engine.initialize(progress, self.engine.profile_name)
+
+    def on_engine_ready(self, error):
+        """Enable listening once the startup thread has finished"""
+        if error is not None:
+            print(f"Error initializing audio: {error}")
+            self.status_label.config(text="Status: Microphone unavailable")
+            return
+        self.toggle_btn.config(state=tk.NORMAL)
+        self.status_label.config(text="Status: Ready")
+
+    def show_startup_progress(self, message):
+        self.status_label.config(text=f"Status: {message}")
+
+    def setup_gui(self):
+        # Menu bar
+        tools_menu = add_profiler_menu(self.root, self.profiler)
+        tools_menu.add_command(label="Re-transcribe Archived Sessions", command=self.retranscribe)
+
+        # Title
+        self.title_label = tk.Label(self.root, font=("Arial", 16))
+        self.title_label.pack(pady=10)
+
+        # Control frame
+        control_frame = tk.Frame(self.root)
+        control_frame.pack(pady=5)
+
+        # Start/Stop button
+        self.toggle_btn = tk.Button(control_frame, text="Start Listening",
+                                   command=self.toggle_listening, bg="#4CAF50", fg="black",
+                                   font=("Arial", 10, "bold"), relief=tk.RAISED, bd=2)
+        self.toggle_btn.pack(side=tk.LEFT, padx=5)
+
+        # Clear button
+        clear_btn = tk.Button(control_frame, text="Clear Text", command=self.clear_text)
+        clear_btn.pack(side=tk.LEFT, padx=5)
+
+        # View logs button
+        logs_btn = tk.Button(control_frame, text="View Logs", command=self.view_logs)
+        logs_btn.pack(side=tk.LEFT, padx=5)
+
+        # Refresh button
+        refresh_btn = tk.Button(control_frame, text="Refresh", command=self.refresh_microphone)
+        refresh_btn.pack(side=tk.LEFT, padx=5)
+
+        # Profile selector; switching keeps the microphone and calibration
+        self.profile_var = tk.StringVar(value=self.engine.profile_name)
+        profile_menu = tk.OptionMenu(control_frame, self.profile_var, *PROFILES, command=self.switch_profile)
+        profile_menu.pack(side=tk.LEFT, padx=5)
+
+        # Status label
+        self.status_label = tk.Label(control_frame, text="Status: Ready")
+        self.status_label.pack(side=tk.LEFT, padx=20)
+
+        # Performance label
+        self.perf_label = tk.Label(control_frame, text="Words: 0 | Phrases: 0")
+        self.perf_label.pack(side=tk.RIGHT, padx=10)
+
+        # Real-time display frame, shown for the real-time profile only
+        self.realtime_frame = tk.Frame(self.root)
+        tk.Label(self.realtime_frame, text="Real-time:", font=("Arial", 10, "bold")).pack(anchor=tk.W)
+        self.realtime_text = tk.Text(self.realtime_frame, height=3, font=("Arial", 12, "italic"),
+                                    bg="#f0f8ff", fg="#0066cc", wrap=tk.WORD)
+        self.realtime_text.pack(fill=tk.X, pady=(5, 10))
+        tk.Label(self.realtime_frame, text="Final Transcriptions:", font=("Arial", 10, "bold")).pack(anchor=tk.W)
+
+        # Text display
+        self.text_area = scrolledtext.ScrolledText(self.root, height=15, width=80, font=("Arial", 12))
+        self.text_area.pack(pady=5, padx=10, fill=tk.BOTH, expand=True)
+
+        # Live latency panel (p50/p90 per pipeline stage)
+        tk.Label(self.root, text="Latency:", font=("Arial", 10, "bold")).pack(anchor=tk.W, padx=10)
+        self.latency_label = tk.Label(self.root, text="No utterances yet", font=("Courier", 9),
+                                      justify=tk.LEFT, anchor=tk.W)
+        self.latency_label.pack(fill=tk.X, padx=10)
+
+        # Instructions
+        self.instructions_label = tk.Label(self.root, fg="gray")
+        self.instructions_label.pack(pady=5)
+
+    def show_profile(self):
+        """Update titles and panels for the current profile"""
+        profile = self.profile
+        self.root.title(profile["title"])
+        self.title_label.config(text=profile["title"])
+        self.instructions_label.config(text=profile["instructions"])
+        self.profile_var.set(self.engine.profile_name)
+        if profile["mode"] == "realtime":
+            self.root.geometry("900x700")
+            self.realtime_frame.pack(fill=tk.X, padx=10, pady=5, before=self.text_area)
+        else:
+            self.root.geometry("700x500")
+            self.realtime_frame.pack_forget()
+
+    def switch_profile(self, name):
+        """Switch to another profile in-process, restarting capture if needed"""
+        if name == self.engine.profile_name:
+            return
+        started = time.perf_counter()
+        was_listening = self.is_listening
+        if was_listening:
+            self.stop_listening()
+        self.engine.apply_profile(name)
+        self.show_profile()
+        if was_listening:
+            self.start_listening()
+        print(f"Switched to {self.profile['label']} profile in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def toggle_listening(self):
+        if not self.is_listening:
+            self.start_listening()
+        else:
+            self.stop_listening()
+
+    def start_listening(self):
+        self.is_listening = True
+        self.toggle_btn.config(text="Stop Listening", bg="#f44336", fg="black",
+                              font=("Arial", 10, "bold"))
+        self.status_label.config(text="Status: Listening...")
+
+        # Start new session
+        self.session_start_time = datetime.now()
+        header = {
+            "start_time": self.session_start_time.strftime("%Y-%m-%d %H:%M:%S"),
+            "profile": self.engine.profile_name,
+        }
+        self.engine.latency.start_session(self.session_start_time)
+        archive = self.engine.open_archive(self.session_start_time)
+        if archive:
+            header["audio_archive"] = archive
+        filename = f"transcription_{self.session_start_time.strftime('%Y-%m-%d_%H-%M-%S')}.json"
+        self.current_session = SessionLog(os.path.join(self.logs_dir, filename), header, self.session_start_time)
+
+        # Reset tracking
+        self.transcription_count = 0
+        self.word_count = 0
+        self.perf_label.config(text="Words: 0 | Phrases: 0")
+        self.realtime_text.delete(1.0, tk.END)
+
+        # Start a new capture run; a previous run hands the microphone over
+        # as soon as its current read returns
+        self.engine.start()
+
+    def stop_listening(self):
+        self.is_listening = False
+        self.toggle_btn.config(text="Start Listening", bg="#4CAF50", fg="black",
+                              font=("Arial", 10, "bold"))
+        self.status_label.config(text="Status: Stopped")
+        self.realtime_text.delete(1.0, tk.END)
+
+        self.engine.stop()
+
+        print(self.engine.microphone.stats_summary())
+        print(self.engine.encoder.stats_summary())
+        print(self.engine.merger.stats_summary())
+        print(self.engine.pool.stats_summary())
+        print(self.engine.limiter.stats_summary())
+        print(self.engine.overload.stats_summary())
+        print(self.engine.speaker_turns.stats_summary())
+        print(self.engine.speech_filter.stats_summary())
+        for line in self.engine.latency.summary_lines():
+            print(f"Latency {line}")
+
+        # Save session if we have transcriptions
+        if self.current_session:
+            print(self.current_session.stats_summary())
+            self.save_session()
+            self.current_session.close()
+
+    def add_transcription(self, text, traces=(), details=None):
+        """Queue recognized text for display and record it in the session"""
+        timestamp = self.engine.timestamp(details)
+        transcription_entry = f"[{timestamp}] {text}"
+        self.transcription_queue.put((transcription_entry, traces))
+
+        words_in_phrase = len(text.split())
+        self.transcription_count += 1
+        self.word_count += words_in_phrase
+        metrics.WORDS.inc(words_in_phrase)
+        if self.unsaved_since is None:
+            self.unsaved_since = time.time()
+
+        # Add to current session
+        if self.current_session:
+            self.current_session.add(text, details, timestamp)
+
+    def show_partial(self, text):
+        """Show the phrase being built in the real-time area"""
+        def update():
+            self.realtime_text.delete(1.0, tk.END)
+            self.realtime_text.insert(1.0, text)
+            self.realtime_text.see(tk.END)
+        self.root.after(0, update)
+
+    def show_status(self, text):
+        self.root.after(0, lambda: self.status_label.config(text=f"Status: {text}"))
+
+    def start_processing(self):
+        # Start checking for transcriptions
+        self.check_transcriptions()
+
+        # Commit real-time phrases as soon as they are final
+        self.check_finalization()
+
+        # Keep the latency panel current
+        self.update_latency_panel()
+
+    def check_finalization(self):
+        if self.is_listening and self.profile["mode"] == "realtime":
+            self.engine.finalize_due_phrase()
+
+        # Tick often so final text lands within ~50 ms of the target
+        self.root.after(50, self.check_finalization)
+
+    def update_latency_panel(self):
+        """Refresh the per-stage latency percentiles once a second"""
+        lines = self.engine.latency.summary_lines()
+        if lines:
+            self.latency_label.config(text="\n".join(lines))
+        self.root.after(1000, self.update_latency_panel)
+
+    def check_transcriptions(self):
+        """Check for new transcriptions and update display"""
+        rendered = False
+        try:
+            while True:
+                transcription, traces = self.transcription_queue.get_nowait()
+                self.text_area.insert(tk.END, transcription + "\n")
+                self.text_area.see(tk.END)
+                rendered = True
+
+                # Close the traces once the text is actually on screen
+                for trace in traces:
+                    trace.mark("rendered")
+                    self.engine.latency.complete(trace)
+        except queue.Empty:
+            pass
+
+        if rendered:
+            # Older lines stay in the session log only
+            lines = int(self.text_area.index("end-1c").split(".")[0])
+            if lines > DISPLAY_LINES:
+                self.text_area.delete("1.0", f"{lines - DISPLAY_LINES + 1}.0")
+
+            encoder_stats = self.engine.encoder.stats()
+            encode_ms = (encoder_stats["cpu_seconds"] + encoder_stats["prepare_cpu_seconds"]) * 1000
+            self.perf_label.config(
+                text=f"Words: {self.word_count} | Phrases: {self.transcription_count} | Encode CPU: {encode_ms:.0f} ms")
+
+        self.root.after(self.profile["display_interval_ms"], self.check_transcriptions)
+
+    def persistence_lag(self):
+        """Seconds the oldest unsaved transcription has been waiting for save_session"""
+        return time.time() - self.unsaved_since if self.unsaved_since is not None else 0.0
+
+    def save_session(self):
+        """Save the current session to a log file"""
+        if not self.current_session:
+            return
+        self.current_session.header.update(self.engine.clock.header())
+        try:
+            filepath = self.current_session.save()
+        except Exception as e:
+            print(f"Error saving session: {e}")
+            return
+        if filepath:
+            self.unsaved_since = None
+            print(f"Session saved to: {filepath}")
+
+    def view_logs(self):
+        """Open the logs directory in file explorer"""
+        import subprocess
+        import platform
+
+        try:
+            if platform.system() == "Darwin":  # macOS
+                subprocess.run(["open", self.logs_dir])
+            elif platform.system() == "Windows":
+                subprocess.run(["explorer", self.logs_dir])
+            else:  # Linux
+                subprocess.run(["xdg-open", self.logs_dir])
+        except Exception as e:
+            print(f"Error opening logs directory: {e}")
+            self.status_label.config(text=f"Logs saved in: {self.logs_dir}")
+
+    def retranscribe(self):
+        """Re-transcribe archived sessions as batch work on the engine's recognition pool"""
+        if not self.engine.ready or self.retranscribing:
+            return
+        import retranscribe
+
+        def run():
+            try:
+                retranscribe.run(self.logs_dir, pool=self.engine.pool)
+                status = "Status: Re-transcription finished"
+            except Exception as e:
+                print(f"Error re-transcribing sessions: {e}")
+                status = "Status: Re-transcription failed"
+            self.retranscribing = False
+            self.root.after(0, lambda: self.status_label.config(text=status))
+
+        self.retranscribing = True
+        self.status_label.config(text="Status: Re-transcribing archived sessions...")
+        threading.Thread(target=run, name="retranscribe", daemon=True).start()
+
+    def refresh_microphone(self):
+        """Refresh the microphone and reset all states"""
+        if not self.engine.ready:
+            return
+
+        if self.is_listening:
+            # Stop listening first
+            self.stop_listening()
+
+        if not self.engine.refresh_microphone():
+            print("Microphone still busy, refresh skipped")
+            return
+
+        self.realtime_text.delete(1.0, tk.END)
+        self.status_label.config(text="Status: Microphone refreshed")
+        print("Microphone refreshed successfully")
+
+    def clear_text(self):
+        self.text_area.delete(1.0, tk.END)
+        self.realtime_text.delete(1.0, tk.END)
+        self.engine.reset_phrase()
+
+    def close(self):
+        """Stop capturing and save the session before the window goes away"""
+        if self.is_listening:
+            self.stop_listening()
+        self.root.destroy()
+
+    def run(self):
+        self.root.mainloop()
+
+
+def main(default_profile="standard", argv=None):
+    """Command line entry point: ``[PRESET] [--profile [SECONDS]]``"""
+    parser = argparse.ArgumentParser(description="Speech Transcriber")
+    parser.add_argument("preset", nargs="?", default=default_profile, choices=list(PROFILES),
+                        help="profile to start with")
+    parser.add_argument("--profile", nargs="?", type=float, const=10.0, default=None, metavar="SECONDS",
+                        help="sample all threads for SECONDS right after startup")
+    parser.add_argument("--archive-audio", action="store_true",
+                        help="keep each session's captured audio in the logs directory")
+    args = parser.parse_args(argv)
+
+    app = TranscriberApp(args.preset)
+    app.engine.archive_audio = args.archive_audio
+    if args.profile:
+        app.profiler.start(args.profile)
+    app.run()
+
+
+if __name__ == "__main__":
+    main()